@@ -0,0 +1,270 @@
+"""
+This script measures how the cost of the teachers grows with the
+size m of the dataset, so that a change that turns a per round cost
+of O(batch) into O(m) is caught
+
+Each teacher is driven through the protocol calls (start,
+get_first_examples, get_new_test_ids, get_new_examples) by a fake,
+instant learner over synthetic labels, for several values of m.
+The first batch has the same size for every m (frac_start = first
+size / m) and the number of rounds is fixed, so a call that only
+depends on the batch has a constant cost, and a call that scans the
+dataset has a cost proportional to m. For each call, the time (and,
+in a second run, the peak of the memory allocated, with tracemalloc)
+is recorded and an empirical complexity exponent b (cost ~ m^b) is
+fitted in log-log scale
+
+The exponents are compared with a baseline (a json file) and the
+script fails (exit code 1) if any exponent grew more than the
+tolerance. The baseline is written with --update-baseline
+
+Usage:
+	python teacher_scaling.py [--sizes 1e4 1e5 1e6 1e7] [--teachers ...]
+		[--no-memory] [--update-baseline] [--baseline path]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tracemalloc
+from timeit import default_timer
+
+import numpy as np
+
+_PATH = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.append(os.path.abspath(os.path.join(_PATH, os.path.pardir, os.path.pardir)))
+
+from machine_teacher import Teachers
+from machine_teacher.Definitions import compact_labels
+from machine_teacher.Definitions import wrapp_ids
+
+_SIZES = (10_000, 100_000, 1_000_000, 10_000_000)
+_QTD_CLASSES = 4
+_QTD_COLUMNS = 4
+_FIRST_SIZE = 50 # the rounds must not exhaust the smallest dataset
+_QTD_ROUNDS = 6
+_ERROR_RATE = 0.2 # of the fake learner, after the first fit
+_TIME_LEFT = 1e9 # the teachers never run out of time
+_TOLERANCE = 0.25 # the exponent may grow this much
+_MIN_TIME = 1e-4 # shorter times are measurement noise
+_MIN_MEMORY = 64 * 1024 # smaller peaks too (in bytes)
+_SEED = 0
+_BASELINE_PATH = os.path.join(_PATH, "teacher_scaling_baseline.json")
+_CALLS = ("start", "get_first_examples", "get_new_test_ids",
+	"get_new_examples")
+
+# the teachers that choose examples by themselves (the composite
+# teachers, PortfolioTeacher and FeaturePruningTeacher, need a real
+# learner or another teacher)
+_TEACHERS = {
+	"WTFTeacher": lambda frac_start: Teachers.WTFTeacher(frac_start=frac_start),
+	"WTFTeacher_scan": lambda frac_start: Teachers.WTFTeacher(
+		frac_start=frac_start, frac_scan_chunk=0.01),
+	"DoubleTeacher": lambda frac_start: Teachers.DoubleTeacher(
+		frac_start=frac_start, strategy=1),
+	"FixedPercWrongTeacher": lambda frac_start: Teachers.FixedPercWrongTeacher(
+		frac_start=frac_start, strategy=1),
+	"FixedPercWrongTeacher_ci": lambda frac_start: Teachers.FixedPercWrongTeacher(
+		frac_start=frac_start, strategy=1, error_ci_width=0.5),
+	"MarginTeacher": lambda frac_start: Teachers.MarginTeacher(frac_start=frac_start),
+	"ClusterTeacher": lambda frac_start: Teachers.ClusterTeacher(frac_start=frac_start),
+	"PerClassErrorTeacher": lambda frac_start: Teachers.PerClassErrorTeacher(
+		frac_start=frac_start),
+	"ProxyTeacher": lambda frac_start: Teachers.ProxyTeacher(frac_start=frac_start),
+	}
+
+class FakeLearner:
+	"""An instant learner: each row has a fixed random value u and is
+	misclassified while u < error rate, that decreases with the square
+	root of the size of the training set"""
+	def __init__(self, y, qtd_classes, seed):
+		self.y = y
+		self.qtd_classes = qtd_classes
+		self.u = np.random.RandomState(seed).rand(y.size).astype(np.float32)
+		self.error_rate = 1.0
+
+	def fit(self, qtd_examples):
+		self.error_rate = _ERROR_RATE * np.sqrt(_FIRST_SIZE / qtd_examples)
+
+	def predict(self, ids):
+		wrong = self.u[ids] < self.error_rate
+		return np.where(wrong, (self.y[ids] + 1) % self.qtd_classes, self.y[ids])
+
+	def predict_scores(self, labels):
+		scores = np.full((len(labels), self.qtd_classes), 0.1)
+		scores[np.arange(len(labels)), labels] = 0.7
+		return scores
+
+def get_dataset(m, seed):
+	random_state = np.random.RandomState(seed)
+	X = random_state.rand(m, _QTD_COLUMNS).astype(np.float32)
+	y = compact_labels(random_state.randint(_QTD_CLASSES, size=m), _QTD_CLASSES)
+	y[:_QTD_CLASSES] = np.arange(_QTD_CLASSES) # every class is present
+	return (X, y)
+
+class Meter:
+	"""Accumulates, for each call, the time or the peak memory"""
+	def __init__(self, memory):
+		self.memory = memory
+		self.costs = dict.fromkeys(_CALLS, 0.0)
+
+	def __call__(self, call, f, *args, **kwargs):
+		if self.memory:
+			tracemalloc.reset_peak()
+			start, __ = tracemalloc.get_traced_memory()
+			result = f(*args, **kwargs)
+			__, peak = tracemalloc.get_traced_memory()
+			self.costs[call] = max(self.costs[call], peak - start)
+		else:
+			t0 = default_timer()
+			result = f(*args, **kwargs)
+			self.costs[call] += default_timer() - t0
+		return result
+
+def run(teacher_name, X, y, memory):
+	"""Runs the teaching rounds (as the protocol) and returns the
+	cost of each call"""
+	m = y.size
+	T = _TEACHERS[teacher_name](_FIRST_SIZE / m)
+	L = FakeLearner(y, _QTD_CLASSES, _SEED)
+	meter = Meter(memory)
+
+	meter("start", T.start, X, y, _TIME_LEFT)
+	new_ids = meter("get_first_examples", T.get_first_examples, _TIME_LEFT)
+	qtd_train = len(new_ids)
+	L.fit(qtd_train)
+
+	for __ in range(_QTD_ROUNDS):
+		test_ids = np.array([], dtype=np.int64)
+		test_labels = np.array([], dtype=y.dtype)
+		while len(test_ids) < m:
+			new_test_ids = meter("get_new_test_ids", T.get_new_test_ids,
+				test_ids, test_labels, _TIME_LEFT)
+			if len(new_test_ids) == 0:
+				break
+			new_test_ids = wrapp_ids(new_test_ids, m)
+			test_ids = np.append(test_ids, new_test_ids)
+			test_labels = np.append(test_labels, L.predict(new_test_ids))
+
+		kwargs = dict()
+		if T.uses_scores:
+			kwargs["test_scores"] = L.predict_scores(test_labels)
+		new_ids = meter("get_new_examples", T.get_new_examples,
+			test_ids, test_labels, _TIME_LEFT, **kwargs)
+		if len(new_ids) == 0:
+			break
+		qtd_train += len(new_ids)
+		L.fit(qtd_train)
+
+	return meter.costs
+
+def get_exponent(sizes, costs, min_cost):
+	"""The slope of log(cost) x log(m), over the sizes where the cost
+	is measurable (None if there are less than two of them)"""
+	sizes = np.asarray(sizes, dtype=np.float64)
+	costs = np.asarray(costs, dtype=np.float64)
+	valid = costs >= min_cost
+	if np.count_nonzero(valid) < 2:
+		return None
+	(b, __) = np.polyfit(np.log(sizes[valid]), np.log(costs[valid]), 1)
+	return float(b)
+
+def measure(teacher_names, sizes, memory):
+	results = dict()
+	for teacher_name in teacher_names:
+		times = {call: [] for call in _CALLS}
+		peaks = {call: [] for call in _CALLS}
+		for m in sizes:
+			(X, y) = get_dataset(m, _SEED)
+			for (call, cost) in run(teacher_name, X, y, False).items():
+				times[call].append(cost)
+			if memory:
+				tracemalloc.start()
+				for (call, cost) in run(teacher_name, X, y, True).items():
+					peaks[call].append(cost)
+				tracemalloc.stop()
+
+		results[teacher_name] = dict()
+		for call in _CALLS:
+			r = {
+				"time": times[call],
+				"time_exponent": get_exponent(sizes, times[call], _MIN_TIME),
+				}
+			if memory:
+				r["peak_memory"] = peaks[call]
+				r["memory_exponent"] = get_exponent(sizes, peaks[call], _MIN_MEMORY)
+			results[teacher_name][call] = r
+			print_result(teacher_name, call, sizes, r)
+	return results
+
+def print_result(teacher_name, call, sizes, r):
+	f = lambda b: "  -  " if b is None else "{:5.2f}".format(b)
+	times = " ".join("{:9.4f}".format(t) for t in r["time"])
+	line = "{:<26} {:<20} {}  b_time {}".format(teacher_name, call, times,
+		f(r["time_exponent"]))
+	if "memory_exponent" in r:
+		line += "  b_memory {}  peak {:8.1f} MB".format(f(r["memory_exponent"]),
+			r["peak_memory"][-1] / 2**20)
+	print(line, flush=True)
+
+def compare(results, baseline, tolerance):
+	"""Returns the list of regressions: the exponents that grew more
+	than tolerance. A call that was too cheap to be measured in the
+	baseline has exponent 0 (its cost did not depend on m)"""
+	regressions = []
+	for (teacher_name, calls) in results.items():
+		if teacher_name not in baseline:
+			continue
+		for (call, r) in calls.items():
+			base = baseline[teacher_name].get(call, {})
+			for key in ("time_exponent", "memory_exponent"):
+				if key not in base:
+					continue
+				(new, old) = (r.get(key), base[key])
+				old = 0.0 if old is None else old
+				if new is not None and new > old + tolerance:
+					regressions.append((teacher_name, call, key, old, new))
+	return regressions
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+	parser.add_argument("--sizes", type=float, nargs="+", default=_SIZES)
+	parser.add_argument("--teachers", nargs="+", default=list(_TEACHERS),
+		choices=list(_TEACHERS))
+	parser.add_argument("--no-memory", action="store_true")
+	parser.add_argument("--tolerance", type=float, default=_TOLERANCE)
+	parser.add_argument("--baseline", default=_BASELINE_PATH)
+	parser.add_argument("--update-baseline", action="store_true")
+	args = parser.parse_args()
+
+	sizes = [int(m) for m in args.sizes]
+	print("m = {}, first batch {}, {} rounds".format(sizes, _FIRST_SIZE,
+		_QTD_ROUNDS))
+	results = measure(args.teachers, sizes, not args.no_memory)
+
+	if args.update_baseline:
+		baseline = dict()
+		if os.path.isfile(args.baseline):
+			with open(args.baseline) as fp:
+				baseline = json.load(fp)
+		baseline.update(results)
+		with open(args.baseline, "w") as fp:
+			json.dump(baseline, fp, indent=1, sort_keys=True)
+		print("baseline saved in", args.baseline)
+		return 0
+
+	if not os.path.isfile(args.baseline):
+		print("no baseline in", args.baseline)
+		return 0
+	with open(args.baseline) as fp:
+		baseline = json.load(fp)
+	regressions = compare(results, baseline, args.tolerance)
+	for (teacher_name, call, key, old, new) in regressions:
+		print("REGRESSION {} {} {}: {:.2f} -> {:.2f}".format(teacher_name,
+			call, key, old, new))
+	return 1 if regressions else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+This script compares Sampler.choose_ids, as it was implemented with
+np.random.choice (the cumulative distribution is rebuilt in every call),
+with a WeightedSampler that is updated between the draws, in a loop
+that changes a few weights and draws a few ids per round (as the
+weight-driven teachers do), for a dataset with m rows
+"""
+
+import os
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+_PATH = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.append(os.path.abspath(os.path.join(_PATH, os.path.pardir, os.path.pardir)))
+
+from machine_teacher.Utils.WeightedSampler import WeightedSampler
+
+_M = 1_000_000
+_QTD_ROUNDS = 20
+_QTD_UPDATES = (100, 10_000) # weights changed per round
+_N = 1000 # draws per round
+_SEED = 0
+
+def numpy_choose_ids(population, weights, n):
+	# the original implementation of Sampler.choose_ids
+	weights_2 = np.append(weights, 1.0 - np.sum(weights))
+	population_2 = np.append(population, len(population))
+	new_ids = np.random.choice(population_2, n,
+		replace = True, p = weights_2)
+	new_ids = np.unique(new_ids)
+	new_ids = [i for i in new_ids if i != len(population)]
+	new_ids = np.array(new_ids)
+	return new_ids
+
+def main():
+	print("m = {}, {} rounds, {} draws per round".format(_M, _QTD_ROUNDS, _N))
+	print("{:>10} {:>12} {:>12} {:>12} {:>8}".format(
+		"updates", "choice (s)", "sampler (s)", "no repl. (s)", "speedup"))
+
+	for qtd_updates in _QTD_UPDATES:
+		rs = np.random.RandomState(_SEED)
+		population = np.arange(_M)
+		weights = np.full(_M, 1/(2.0*_M))
+
+		t_numpy = 0.0
+		t_sampler = 0.0
+		t_sampler_no_replace = 0.0
+		sampler = WeightedSampler(weights, _SEED)
+		for __ in range(_QTD_ROUNDS):
+			ids = rs.choice(_M, qtd_updates, replace=False)
+			new_weights = weights[ids] * 1.5
+
+			t0 = default_timer()
+			weights[ids] = new_weights
+			weights /= np.sum(weights) * 2
+			numpy_choose_ids(population, weights, _N)
+			t_numpy += default_timer() - t0
+
+			# the sampler does not need normalized weights
+			t0 = default_timer()
+			sampler.update(ids, new_weights)
+			sampler.sample(_N)
+			t_sampler += default_timer() - t0
+
+			t0 = default_timer()
+			sampler.sample(_N, replace=False)
+			t_sampler_no_replace += default_timer() - t0
+
+		print("{:>10} {:>12.4f} {:>12.4f} {:>12.4f} {:>8.1f}".format(
+			qtd_updates, t_numpy, t_sampler, t_sampler_no_replace,
+			t_numpy/t_sampler))
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,87 @@
+"""
+This script compares the time of WTFTeacher._select_examples with
+the time of the original python loop, for a dataset with m rows
+and a fraction of misclassified rows, and checks that both select
+the same examples (same seed)
+"""
+
+import os
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+_PATH = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.append(os.path.abspath(os.path.join(_PATH, os.path.pardir, os.path.pardir)))
+
+from machine_teacher.Teachers import WTFTeacher
+from machine_teacher.Definitions import create_ids
+
+_M = 1_000_000
+_FRACS_WRONG = (0.01, 0.1, 0.5)
+_NS = (1, 1024, 65536)
+_SEED = 0
+
+def loop_select_examples(random_state, n, wrong_labels, delta_w):
+	# the original implementation of WTFTeacher._select_examples
+	random_numbers = random_state.rand(n)
+	random_numbers = np.sort(random_numbers)
+
+	j = 0
+	i = 0
+	aux = 0
+	flag = True
+	N = wrong_labels.size
+	S = []
+	while (j < n) and (i < N):
+		if flag:
+			aux += delta_w[i]
+		flag = False
+		if random_numbers[j] <= aux:
+			if random_numbers[j] > (aux-delta_w[i]):
+				S.append(wrong_labels[i])
+				flag = True
+				i+=1
+			j+=1
+		else:
+			i+=1
+			flag = True
+
+	return S
+
+def main():
+	print("m = {}".format(_M))
+	print("{:>10} {:>8} {:>10} {:>10} {:>8}".format(
+		"frac_wrong", "n", "loop (s)", "numpy (s)", "speedup"))
+
+	for frac_wrong in _FRACS_WRONG:
+		for n in _NS:
+			rs = np.random.RandomState(_SEED)
+			ids = create_ids(_M)
+			wrong_labels = np.sort(rs.choice(ids, int(frac_wrong*_M), replace=False))
+			# first iteration: w = 1/2m, the smallest k with v*k >= 1
+			w = 1/(2.0*_M)
+			k = 1
+			while w * wrong_labels.size * k < 1.0:
+				k *= 2
+			delta_w = np.full(wrong_labels.size, (w*k - w)/2)
+
+			T = WTFTeacher(seed = _SEED)
+			T._random = np.random.RandomState(_SEED)
+			T.n = n
+			t0 = default_timer()
+			S_numpy = T._select_examples(wrong_labels, delta_w)
+			t_numpy = default_timer() - t0
+
+			t0 = default_timer()
+			S_loop = loop_select_examples(np.random.RandomState(_SEED),
+				n, wrong_labels, delta_w)
+			t_loop = default_timer() - t0
+
+			assert np.array_equal(S_numpy, np.array(S_loop, dtype=S_numpy.dtype))
+			print("{:>10} {:>8} {:>10.4f} {:>10.4f} {:>8.1f}".format(
+				frac_wrong, n, t_loop, t_numpy, t_loop/t_numpy))
+
+if __name__ == "__main__":
+	main()
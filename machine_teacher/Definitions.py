@@ -7,6 +7,12 @@ extract statistics from objects of these types are provided
 InputSpace -- a two dimensional array from numpy lib
 Labels -- a one dimensional array from numpy lib
 
+The module also centralizes the dtype policy for ids (row numbers)
+and labels: ids are int32 whenever the dataset has less than 2^31
+rows and labels are uint8/uint16/uint32, depending on the number
+of classes. Smaller dtypes mean less memory traffic in the teachers,
+that spend most of their time shuffling and filtering ids
+
 """
 
 import numpy as np
@@ -19,6 +25,10 @@ Labels = np.ndarray
 _ROW_AXIS = 0
 _COL_AXIS = 1
 
+# dtype policy
+_IDS_DTYPES = (np.int32, np.int64)
+_LABELS_DTYPES = (np.uint8, np.uint16, np.uint32)
+
 def get_qtd_rows(v) -> int:
 	"""Returns the qtd of rows of the array v"""
 	return v.shape[_ROW_AXIS]
@@ -55,3 +65,38 @@ def wrapp_labels(y: Labels):
 	"""Transforms an interable y in a one dimensional
 	array from numpy lib"""
 	return np.array(y).reshape(-1)
+
+def compact_labels(y: Labels, qtd_classes: int = None):
+	"""Casts the labels y (integers from 0 to qtd_classes-1)
+	to the smallest unsigned dtype able to represent them"""
+	if qtd_classes is None:
+		qtd_classes = int(np.max(y)) + 1 if y.size > 0 else 1
+	return y.astype(get_labels_dtype(qtd_classes), copy = False)
+
+def get_labels_dtype(qtd_classes: int):
+	"""Returns the dtype used for labels of a dataset
+	with qtd_classes classes"""
+	for dtype in _LABELS_DTYPES:
+		if qtd_classes - 1 <= np.iinfo(dtype).max:
+			return dtype
+	return np.int64
+
+# Ids functions
+
+def get_ids_dtype(m: int):
+	"""Returns the dtype used for ids (row numbers) of a dataset
+	with m rows"""
+	for dtype in _IDS_DTYPES:
+		if m - 1 <= np.iinfo(dtype).max:
+			return dtype
+	raise ValueError("too many rows: " + str(m))
+
+def create_ids(m: int):
+	"""Returns the vector of ids 0, 1, ..., m-1 of a dataset
+	with m rows"""
+	return np.arange(m, dtype=get_ids_dtype(m))
+
+def wrapp_ids(ids, m: int):
+	"""Transforms an interable of ids of a dataset with m rows
+	in a one dimensional array from numpy lib"""
+	return np.asarray(ids, dtype=get_ids_dtype(m)).reshape(-1)
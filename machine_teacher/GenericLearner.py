@@ -27,23 +27,45 @@ class Learner:
 		Preprocess some data, if needed.
 		Signals to the Learner that the teaching will start
 
-	fit(X: InputSpace, y: Labels) -> None
-		fit the data (matrix) X to labels (vector) y
+	fit(X: InputSpace, y: Labels, sample_weight = None) -> None
+		fit the data (matrix) X to labels (vector) y, optionally
+		with a weight for each example
 
 	predict(X: InputSpace) -> Labels:
 		apply the current model to the data X
 
 	get_params() -> dict
 		returns the parameters used by the Learner
+
+	Learners that set uses_ids = True receive the whole dataset
+	once (set_dataset) and, after that, only the ids (row numbers)
+	of the examples to fit (fit_ids) or to classify (predict_ids)
+
+	Learners that set supports_scores = True can also return, along
+	with the labels, a score for each class (probabilities or decision
+	values), with predict_with_scores (or predict_ids_with_scores)
+
+	Learners that set supports_feature_importances = True report the
+	importance of each column for the current model, with
+	get_feature_importances
+
+	Learners that set incremental = True can update the current model
+	with new examples only (partial_fit, or partial_fit_ids), instead
+	of fitting all the examples again. The classes of the dataset are
+	informed before the first update (set_classes)
 	"""
 	name = "GenericLearner"
+	uses_ids = False
+	supports_scores = False
+	supports_feature_importances = False
+	incremental = False
 
 	def start(self):
 		"""Just starts the Learner. Only useful it the learner
 		has some kind of preprocessing"""
 		pass
 
-	def fit(self, X: InputSpace, y: Labels) -> None:
+	def fit(self, X: InputSpace, y: Labels, sample_weight = None) -> None:
 		""" Fit the data (matrix) X to labels (vector) y
 		The model Learner model is updated
 		Returns nothing (None)
@@ -53,6 +75,9 @@ class Learner:
 		X: InputSpace -- the data (features values), a matrix, where
 						 each row is an example
 		y: Labels -- the correct class for each example
+		sample_weight -- the weight of each example (None: the same
+		weight for all). Only given by the protocol if the teacher
+		weights the examples (see Teacher.get_sample_weight)
 		"""
 		raise NotImplementedError
 
@@ -69,4 +94,137 @@ class Learner:
 
 	def get_params(self) -> dict:
 		"""Returns the set of parameters in the learner configuration"""
-		return dict()
\ No newline at end of file
+		return dict()
+
+	def predict_with_scores(self, X: InputSpace):
+		""" Predicts the class of each example in X, as predict, and
+		returns (labels, scores), where scores[i, c] is the score of the
+		class c for the example i (the higher, the more likely).
+		Only called by the protocol if supports_scores is True
+
+		Parameters
+		-----------
+		X: InputSpace -- the data (features values), a matrix, where
+						 each row is an example
+		"""
+		raise NotImplementedError
+
+	def get_feature_importances(self) -> np.ndarray:
+		""" Returns the importance (a non negative value, the higher,
+		the more important) of each column of the data of the last fit,
+		for the current model (e.g. the feature importances of a tree
+		or the magnitude of the coefficients of a linear model).
+		Only called by the protocol if supports_feature_importances is True
+		"""
+		raise NotImplementedError
+
+	def set_classes(self, classes) -> None:
+		"""Informs all the classes of the dataset, the classes
+		of the model, even if some of them are missing in the
+		first examples. Only called by the protocol if incremental
+		is True
+
+		Parameters
+		-----------
+		classes -- the (sorted) classes of the dataset
+		"""
+		raise NotImplementedError
+
+	def partial_fit(self, X: InputSpace, y: Labels,
+		sample_weight = None) -> None:
+		""" Updates the current model with the new examples X, with
+		labels y (the model keeps what it learned with the previous
+		examples). Only called by the protocol if incremental is True
+
+		Parameters
+		-----------
+		X: InputSpace -- the new examples, a matrix, where
+						 each row is an example
+		y: Labels -- the correct class for each example
+		sample_weight -- the weight of each example (as in fit)
+		"""
+		raise NotImplementedError
+
+	def partial_fit_ids(self, ids, sample_weight = None) -> None:
+		""" The same as partial_fit, for the examples X[ids].
+		Only called by the protocol if uses_ids and incremental
+		are True
+
+		Parameters
+		-----------
+		ids -- vector of indexes, corresponding to examples ids
+		in the dataset X
+		sample_weight -- the weight of each example in ids (as in fit)
+		"""
+		raise NotImplementedError
+
+	def set_dataset(self, X: InputSpace, y: Labels) -> None:
+		"""Informs the entire dataset (X, y) to the learner.
+		Only called by the protocol if uses_ids is True
+
+		Parameters
+		-----------
+		X: InputSpace -- the data (features values), a matrix, where
+						 each row is an example
+		y: Labels -- the correct class for each example
+		"""
+		raise NotImplementedError
+
+	def fit_ids(self, ids, sample_weight = None) -> None:
+		""" Fit the examples X[ids] to the labels y[ids], where
+		(X, y) is the dataset informed by set_dataset.
+		Only called by the protocol if uses_ids is True
+
+		Parameters
+		-----------
+		ids -- vector of indexes, corresponding to examples ids
+		in the dataset X
+		sample_weight -- the weight of each example in ids (as in fit)
+		"""
+		raise NotImplementedError
+
+	def predict_ids(self, ids) -> Labels:
+		""" Predicts the class of the examples X[ids], where
+		X is the dataset informed by set_dataset.
+		Only called by the protocol if uses_ids is True
+
+		Parameters
+		-----------
+		ids -- vector of indexes, corresponding to examples ids
+		in the dataset X
+		"""
+		raise NotImplementedError
+
+	def predict_ids_with_scores(self, ids):
+		""" The same as predict_with_scores, for the examples X[ids].
+		Only called by the protocol if uses_ids and supports_scores
+		are True
+
+		Parameters
+		-----------
+		ids -- vector of indexes, corresponding to examples ids
+		in the dataset X
+		"""
+		raise NotImplementedError
+
+def get_scores_by_class(scores, classes, fill_value = -np.inf):
+	"""Returns the scores (one column for each class in classes,
+	as in sklearn) with one column for each class c = 0..max(classes),
+	in the column c. The classes missing in classes (not seen by the
+	model) get fill_value
+
+	Parameters
+	-----------
+	scores -- a matrix (or a vector, the decision function of a binary
+	classifier) of scores
+	classes -- the classes (labels) of the columns of scores
+	fill_value -- the score of the missing classes
+	"""
+	scores = np.asarray(scores, dtype=np.float64)
+	if scores.ndim == 1:
+		scores = np.column_stack((-scores, scores))
+	classes = np.asarray(classes, dtype=np.int64)
+
+	by_class = np.full((scores.shape[0], np.max(classes) + 1), fill_value)
+	by_class[:, classes] = scores
+	return by_class
\ No newline at end of file
@@ -19,6 +19,8 @@ import numpy as np
 from .Definitions import get_qtd_rows
 from .Definitions import InputSpace
 from .Definitions import Labels
+from .Definitions import create_ids
+from .Utils.LabelIndex import LabelIndex
 
 class Teacher:
 	"""
@@ -52,9 +54,24 @@ class Teacher:
 
 	get_params() -> dict
 		Returns the parameters used by the Teacher
+
+	Teachers that set uses_scores = True receive, in get_new_examples,
+	the keyword argument test_scores: the scores (see
+	Learner.predict_with_scores) of the tested examples, one row for
+	each id in test_ids, or None if the learner does not support scores
+
+	Teachers that set uses_column_mask = True can also choose the
+	columns (features) the learner uses, with get_column_mask
+
+	Teachers that set uses_sample_weight = True give a weight to each
+	training example, with get_sample_weight, so they can emphasize
+	examples without sending more examples
 	"""
 
 	name = "GenericTeacher"
+	uses_scores = False
+	uses_column_mask = False
+	uses_sample_weight = False
 
 	def start(self, X: InputSpace, y: Labels, time_left: float):
 		"""Starts the Teacher.
@@ -137,6 +154,36 @@ class Teacher:
 		else:
 			return []
 
+	def get_column_mask(self, feature_importances,
+		time_left: float) -> np.ndarray:
+		"""
+		Returns a mask (a boolean vector, one value for each column
+		of the dataset) of the columns the learner must use from the next
+		fit on, or None to keep the current columns. Called after
+		each get_new_examples, only if uses_column_mask is True
+
+		Parameters
+		-----------
+		feature_importances -- the importance of each column of the
+		dataset for the current model (zero for the columns not used),
+		or None if the learner does not report importances
+		time_left: float -- how much time is left for the interaction
+		between the teacher and the learner
+		"""
+		return None
+
+	def get_sample_weight(self, train_ids) -> np.ndarray:
+		"""
+		Returns the weight (a non negative value) of each example of the
+		training set, used in the next fit. Called before each fit,
+		only if uses_sample_weight is True
+
+		Parameters
+		-----------
+		train_ids -- the (ids of the) examples of the training set
+		"""
+		return np.ones(len(train_ids))
+
 	def get_params(self) -> dict:
 		"""Returns the set of parameters in the teacher configuration"""
 		return dict()
@@ -146,7 +193,7 @@ class Teacher:
 		in case the subclass does not implement one.
 
 		Just saves the features matrix X and the labels y of
-		each row of X
+		each row of X, and builds the index of the labels
 
 		Parameters
 		-----------
@@ -157,7 +204,8 @@ class Teacher:
 		between the teacher and the learner"""
 		self.X = X
 		self.y = y
-		self.ids = np.arange(y.size, dtype=int)
+		self.ids = create_ids(y.size)
+		self.label_index = LabelIndex(y)
 
 		qtd_rows_X = get_qtd_rows(X)
 		qtd_rows_y = get_qtd_rows(y)
@@ -180,13 +228,16 @@ class Teacher:
 		wrong_labels = wrong_labels.reshape(-1)
 		return self.ids[wrong_labels]
 
-	def _get_accuracy(self, h):
-		"""Returns the accuracy of the classification h
+	def _get_accuracy(self, h = None):
+		"""Returns the accuracy of the classification h (None if h is
+		not given: this teacher has no estimate of its own)
 
 		Parameters
 		-----------
 		h: Labels -> a vector of labels, with the same number of
 		rows as the vector of correct labels self.y"""
+		if h is None:
+			return None
 		wrong_labels = self._get_wrong_labels_id(h)
 		accuracy = 1 - len(wrong_labels) / len(self.y)
 		return accuracy
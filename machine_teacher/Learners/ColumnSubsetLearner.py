@@ -0,0 +1,85 @@
+"""
+This module implements the ColumnSubsetLearner, a wrapper that
+fits and applies a learner over a subset of the columns of the data
+
+The protocol wraps the learner when the teacher chooses the columns
+(see Teacher.get_column_mask). A new subset only takes effect in the
+next fit, so the current model (and every copy of it, as the
+selected learner) always predicts with the columns it was trained on
+"""
+
+import numpy as np
+
+from ..GenericLearner import Learner
+from ..Definitions import get_qtd_columns
+from ..Utils.Fingerprint import get_ids_fingerprint
+
+class ColumnSubsetLearner(Learner):
+	"""
+	Parameters
+	-----------
+	learner: Learner -- the wrapped learner
+	columns -- the (indexes of the) columns used (None: all the columns)
+
+	Methods
+	-----------
+	set_columns(columns)
+		Sets the columns used from the next fit on
+
+	get_qtd_active_columns() -> int
+		Returns the number of columns used by the current model
+	"""
+	def __init__(self, learner: Learner, columns = None):
+		self.learner = learner
+		self.name = learner.name
+		self.columns = columns # of the current model
+		self.next_columns = columns
+		self.qtd_columns = None # of the data
+
+	def start(self):
+		self.learner.start()
+		# may be known only after start (e.g. RemoteLearner)
+		self.supports_scores = self.learner.supports_scores
+		self.supports_feature_importances = \
+			self.learner.supports_feature_importances
+
+	def set_columns(self, columns):
+		self.next_columns = (None if columns is None
+			else np.asarray(columns, dtype=np.int64))
+
+	def get_qtd_active_columns(self) -> int:
+		if self.columns is None:
+			return self.qtd_columns
+		return len(self.columns)
+
+	def fit(self, X, y, sample_weight = None):
+		self.columns = self.next_columns
+		self.qtd_columns = get_qtd_columns(X)
+		if sample_weight is None:
+			return self.learner.fit(self._get_columns(X), y)
+		return self.learner.fit(self._get_columns(X), y,
+			sample_weight=sample_weight)
+
+	def predict(self, X):
+		return self.learner.predict(self._get_columns(X))
+
+	def predict_with_scores(self, X):
+		return self.learner.predict_with_scores(self._get_columns(X))
+
+	def get_feature_importances(self):
+		# one value for each column of the data
+		importances = self.learner.get_feature_importances()
+		if self.columns is None:
+			return importances
+		all_importances = np.zeros(self.qtd_columns)
+		all_importances[self.columns] = importances
+		return all_importances
+
+	def get_params(self):
+		params = dict(self.learner.get_params())
+		if self.next_columns is not None:
+			params["columns"] = get_ids_fingerprint(self.next_columns)
+		return params
+
+	def _get_columns(self, X):
+		return X if self.columns is None else X[:, self.columns]
@@ -1,23 +1,265 @@
 from ..GenericLearner import Learner
+from ..GenericLearner import get_scores_by_class
 import lightgbm as LGBM
 import numpy as np
 
+from copy import deepcopy
+
+# parameters of the LGBMClassifier that are not parameters of LGBM.train
+_SKLEARN_ONLY_PARAMS = ("n_estimators", "importance_type", "class_weight")
+_CONTINUED_OBJECTIVES = (None, "binary", "multiclass")
 
 class LGBMLearner(Learner):
+	"""
+	A gradient boosting of trees (LightGBM)
+
+	Parameters
+	-----------
+	binned_dataset: bool -- whether the dataset is binned once, in a
+	lgb.Dataset built in the first fit: each fit trains on a subset of
+	it (Dataset.subset), that reuses the bins, instead of binning the
+	examples again
+	trees_per_round: int -- if given, each fit (but the first) goes on
+	boosting the current model, with trees_per_round more iterations
+	over the new training set, instead of training n_estimators
+	iterations from scratch
+	max_trees: int -- maximum number of iterations of a model boosted
+	across the fits (None: _MAX_TREES_FACTOR times n_estimators). A
+	fit that would exceed it trains from scratch
+	args, kwargs -- the parameters of the LGBMClassifier
+
+	With binned_dataset or trees_per_round, the learner receives the
+	whole dataset (uses_ids) and the model is trained with LGBM.train,
+	in parts: the boosters trained in each fit, the next one starting
+	from the scores of the previous ones. The boosters are never
+	changed after trained, so a copy of the learner (as the learners
+	selected by the protocol) shares them with the original: it only
+	keeps how many of them are its model
+
+	With trees_per_round, the raw scores of the model over the whole
+	dataset are kept and updated, after each fit, with the new part
+	only: the examples of the dataset are classified (and the next
+	fit starts) from them, so their cost does not depend on the
+	number of parts
+	"""
 	name = "LGBMLearner"
+	supports_scores = True
+	supports_feature_importances = True
+	_MAX_TREES_FACTOR = 2
 
-	def __init__(self, *args, **kwargs):
+	def __init__(self, *args, binned_dataset: bool = False,
+		trees_per_round: int = None, max_trees: int = None, **kwargs):
 		self.args = args
 		self.kwargs = kwargs
+		self.binned_dataset = binned_dataset
+		self.trees_per_round = trees_per_round
+		self.max_trees = max_trees
+		self.native = binned_dataset or trees_per_round is not None
+		self.uses_ids = self.native
+
+		assert trees_per_round is None or trees_per_round >= 1, \
+			"trees_per_round must be at least 1"
+		assert max_trees is None or max_trees >= 1, \
+			"max_trees must be at least 1"
 
 	def start(self):
 		self.model = LGBM.LGBMClassifier(*self.args, **self.kwargs)
-		
-	def fit(self, X, y):
-		return self.model.fit(X, y)
+		self.parts = [] # the boosters of the model, if native
+		self.X = None
+		self.y = None
+		self.qtd_classes = None
+		self.dataset = None
+		self.raw = None # raw scores of the parts over X (if trees_per_round)
+		if self.native:
+			params = self.model.get_params()
+			assert params["class_weight"] is None, \
+				"class_weight is only supported by the LGBMClassifier"
+			assert (self.trees_per_round is None or
+				params["objective"] in _CONTINUED_OBJECTIVES), \
+				"continued boosting only supports the objectives {}".format(
+					_CONTINUED_OBJECTIVES[1:])
+
+	def set_dataset(self, X, y):
+		self.X = X
+		self.y = y
+		self.qtd_classes = int(np.max(y)) + 1
+		self.dataset = None
+		self.raw = None
+
+	def fit(self, X, y, sample_weight = None):
+		if not self.native:
+			return self.model.fit(X, y, sample_weight=sample_weight)
+		# examples out of the dataset: binned again
+		if self.y is None:
+			self.qtd_classes = int(np.max(y)) + 1
+		params = self._get_train_params()
+		init_parts = self._get_init_parts(X.shape[1])
+		dataset = LGBM.Dataset(X, label=y, weight=sample_weight,
+			init_score=self._get_raw_scores(init_parts, X), params=params)
+		self._train(params, dataset, init_parts)
+		self.raw = None # not the scores of the dataset
+
+	def fit_ids(self, ids, sample_weight = None):
+		params = self._get_train_params()
+		init_parts = self._get_init_parts(self.X.shape[1])
+		init_score = None
+		if len(init_parts) > 0:
+			init_score = self._get_dataset_raw_scores()[ids]
+
+		if not self.binned_dataset:
+			dataset = LGBM.Dataset(self.X[ids], label=self.y[ids],
+				weight=sample_weight, init_score=init_score, params=params)
+		else:
+			if self.dataset is None:
+				self.dataset = LGBM.Dataset(self.X, label=self.y,
+					params=params, free_raw_data=True).construct()
+			# the subset must be sorted. Its fields are only kept if set
+			# after it is constructed
+			order = np.argsort(ids, kind="stable")
+			dataset = self.dataset.subset(np.asarray(ids)[order]).construct()
+			if sample_weight is not None:
+				dataset.set_weight(np.asarray(sample_weight)[order])
+			if init_score is not None:
+				dataset.set_init_score(init_score[order])
+
+		raw = self.raw if len(init_parts) > 0 else None
+		self._train(params, dataset, init_parts)
+
+		# the scores of the dataset, updated with the new part (a new
+		# array: the copies keep theirs)
+		self.raw = None
+		if raw is not None:
+			self.raw = raw + self.parts[-1].predict(self.X, raw_score=True)
+
+	def _get_dataset_raw_scores(self):
+		# the raw scores of the current parts over the dataset
+		if self.raw is None:
+			self.raw = self._get_raw_scores(self.parts, self.X)
+		return self.raw
+
+	def _get_init_parts(self, qtd_columns):
+		# the parts the new one starts from (none: from scratch)
+		if self.trees_per_round is None or len(self.parts) == 0:
+			return []
+		if self.parts[0].num_feature() != qtd_columns:
+			return [] # other columns (see ColumnSubsetLearner)
+		qtd_iters = sum(part.current_iteration() for part in self.parts)
+		if qtd_iters + self.trees_per_round > self._get_max_trees():
+			return []
+		return self.parts
+
+	def _get_max_trees(self) -> int:
+		if self.max_trees is not None:
+			return self.max_trees
+		return self._MAX_TREES_FACTOR * self.model.get_params()["n_estimators"]
+
+	def _get_raw_scores(self, parts, X):
+		# the scores before the transformation of the objective
+		if len(parts) == 0:
+			return None
+		return sum(part.predict(X, raw_score=True) for part in parts)
+
+	def _train(self, params, dataset, init_parts):
+		num_boost_round = self.model.get_params()["n_estimators"]
+		if len(init_parts) > 0:
+			num_boost_round = self.trees_per_round
+		booster = LGBM.train(params, dataset,
+			num_boost_round=num_boost_round)
+		booster.free_dataset()
+		# a new list: the copies keep theirs
+		self.parts = init_parts + [booster]
+
+	def _get_train_params(self) -> dict:
+		params = {k: v for (k, v) in self.model.get_params().items()
+			if v is not None and k not in _SKLEARN_ONLY_PARAMS}
+		params.setdefault("verbose", -1)
+		if self.qtd_classes > 2:
+			params.setdefault("objective", "multiclass")
+			params["num_class"] = self.qtd_classes
+		else:
+			params.setdefault("objective", "binary")
+		return params
 
 	def predict(self, X):
-		return self.model.predict(X)
+		if not self.native:
+			return self.model.predict(X)
+		return np.argmax(self._predict_proba(X), axis=1)
+
+	def predict_ids(self, ids):
+		return np.argmax(self._predict_proba_ids(ids), axis=1)
+
+	def predict_with_scores(self, X):
+		if not self.native:
+			scores = self.model.predict_proba(X)
+			labels = self.model.classes_[np.argmax(scores, axis=1)]
+			return (labels, get_scores_by_class(scores, self.model.classes_, 0.0))
+		scores = self._predict_proba(X)
+		return (np.argmax(scores, axis=1), scores)
+
+	def predict_ids_with_scores(self, ids):
+		scores = self._predict_proba_ids(ids)
+		return (np.argmax(scores, axis=1), scores)
+
+	def _predict_proba_ids(self, ids):
+		if self.trees_per_round is None:
+			return self._predict_proba(self.X[ids])
+		return self._transform(self._get_dataset_raw_scores()[ids])
+
+	def _predict_proba(self, X):
+		# one column for each class of the dataset
+		if len(self.parts) == 1:
+			scores = self.parts[0].predict(X)
+			if scores.ndim == 1:
+				scores = np.column_stack((1 - scores, scores))
+			return scores
+		return self._transform(self._get_raw_scores(self.parts, X))
+
+	def _transform(self, raw):
+		# the raw scores transformed as by the objective
+		if raw.ndim == 1:
+			sigmoid = self._get_train_params().get("sigmoid", 1.0)
+			scores = 1.0 / (1.0 + np.exp(-sigmoid * raw))
+			return np.column_stack((1 - scores, scores))
+		scores = np.exp(raw - np.max(raw, axis=1, keepdims=True))
+		return scores / scores.sum(axis=1, keepdims=True)
+
+	def get_feature_importances(self):
+		if not self.native:
+			return np.asarray(self.model.feature_importances_, dtype=np.float64)
+		importance_type = self.model.get_params()["importance_type"]
+		return sum(np.asarray(part.feature_importance(importance_type),
+			dtype=np.float64) for part in self.parts)
 
 	def get_params(self):
-		return self.model.get_params()
\ No newline at end of file
+		params = self.model.get_params()
+		if self.binned_dataset:
+			params["binned_dataset"] = True
+		if self.trees_per_round is not None:
+			params["trees_per_round"] = self.trees_per_round
+			params["max_trees"] = self._get_max_trees()
+		return params
+
+	def __deepcopy__(self, memo):
+		# the dataset (and its bins), the boosters and the raw scores
+		# (replaced, never changed, by the next fit) are shared by the
+		# copies, only the list of boosters is copied
+		other = LGBMLearner.__new__(LGBMLearner)
+		shared = ("X", "y", "dataset", "raw")
+		for (k, v) in self.__dict__.items():
+			if k in shared:
+				other.__dict__[k] = v
+			elif k == "parts":
+				other.__dict__[k] = list(v)
+			else:
+				other.__dict__[k] = deepcopy(v, memo)
+		return other
+
+	def __getstate__(self):
+		# the dataset is not pickled: a learner loaded over
+		# another one (see ModelCache.load) keeps its dataset
+		# (the raw scores are computed again, if needed)
+		state = dict(self.__dict__)
+		for k in ("X", "y", "dataset"):
+			state.pop(k, None)
+		state["raw"] = None
+		return state
@@ -1,9 +1,12 @@
 from ..GenericLearner import Learner
+from ..GenericLearner import get_scores_by_class
 from sklearn.linear_model import LogisticRegression
 import numpy as np
 
 class LogisticRegressionLearner(Learner):
 	name = "LogisticRegressionLearner"
+	supports_scores = True
+	supports_feature_importances = True
 
 	def __init__(self, *args, **kwargs):
 		self.args = args
@@ -13,11 +16,20 @@ class LogisticRegressionLearner(Learner):
 		self.model = LogisticRegression(*self.args, **self.kwargs)
 		super().start()
 
-	def fit(self, X, y):
-		return self.model.fit(X, y)
+	def fit(self, X, y, sample_weight = None):
+		return self.model.fit(X, y, sample_weight=sample_weight)
 
 	def predict(self, X):
 		return self.model.predict(X)
 
+	def predict_with_scores(self, X):
+		scores = self.model.predict_proba(X)
+		labels = self.model.classes_[np.argmax(scores, axis=1)]
+		return (labels, get_scores_by_class(scores, self.model.classes_, 0.0))
+
+	def get_feature_importances(self):
+		# magnitude of the coefficients, summed over the classes
+		return np.abs(np.atleast_2d(self.model.coef_)).sum(axis=0)
+
 	def get_params(self):
 		return self.model.get_params()
\ No newline at end of file
@@ -0,0 +1,45 @@
+from ..GenericLearner import Learner
+from ..GenericLearner import get_scores_by_class
+from sklearn.naive_bayes import GaussianNB
+import numpy as np
+
+class NaiveBayesLearner(Learner):
+	"""
+	A gaussian naive Bayes (sklearn's GaussianNB). Incremental: in each
+	iteration, the counts, means and variances of the classes are
+	updated with the new examples, so the model is the same as the one
+	fitted with all the examples
+	"""
+	name = "NaiveBayesLearner"
+	supports_scores = True
+	incremental = True
+
+	def __init__(self, *args, **kwargs):
+		self.args = args
+		self.kwargs = kwargs
+
+	def start(self):
+		self.model = GaussianNB(*self.args, **self.kwargs)
+		self.classes = None
+
+	def set_classes(self, classes):
+		self.classes = np.asarray(classes)
+
+	def fit(self, X, y, sample_weight = None):
+		return self.model.fit(X, y, sample_weight=sample_weight)
+
+	def partial_fit(self, X, y, sample_weight = None):
+		classes = self.classes if self.classes is not None else np.unique(y)
+		return self.model.partial_fit(X, y, classes=classes,
+			sample_weight=sample_weight)
+
+	def predict(self, X):
+		return self.model.predict(X)
+
+	def predict_with_scores(self, X):
+		scores = self.model.predict_proba(X)
+		labels = self.model.classes_[np.argmax(scores, axis=1)]
+		return (labels, get_scores_by_class(scores, self.model.classes_, 0.0))
+
+	def get_params(self):
+		return self.model.get_params()
@@ -1,9 +1,12 @@
 from ..GenericLearner import Learner
+from ..GenericLearner import get_scores_by_class
 from sklearn.ensemble import RandomForestClassifier
 import numpy as np
 
 class RandomForestLearner(Learner):
 	name = "RandomForestLearner"
+	supports_scores = True
+	supports_feature_importances = True
 
 	def __init__(self, *args, **kwargs):
 		self.args = args
@@ -12,11 +15,19 @@ class RandomForestLearner(Learner):
 	def start(self):
 		self.model = RandomForestClassifier(*self.args, **self.kwargs)
 
-	def fit(self, X, y):
-		return self.model.fit(X, y)
+	def fit(self, X, y, sample_weight = None):
+		return self.model.fit(X, y, sample_weight=sample_weight)
 
 	def predict(self, X):
 		return self.model.predict(X)
 
+	def predict_with_scores(self, X):
+		scores = self.model.predict_proba(X)
+		labels = self.model.classes_[np.argmax(scores, axis=1)]
+		return (labels, get_scores_by_class(scores, self.model.classes_, 0.0))
+
+	def get_feature_importances(self):
+		return np.asarray(self.model.feature_importances_, dtype=np.float64)
+
 	def get_params(self):
 		return self.model.get_params()
\ No newline at end of file
@@ -0,0 +1,393 @@
+"""
+This module implements the RemoteLearner, a proxy to a learner
+that runs in a separate (long-lived) process, the learner server
+
+The proxy and the server talk over a UNIX socket. The dataset X
+(and its labels y) is exchanged only once, through shared memory,
+and after that only row numbers (ids) go over the wire in each
+fit/predict call. Every call has its transport overhead (round trip
+time minus the time spent by the server) recorded, so the cost of
+isolating the learner in another process can be measured
+
+A server can be started by the proxy itself (address = None) or
+separately, with the function serve
+"""
+
+import os
+import tempfile
+import traceback
+from copy import deepcopy
+from multiprocessing import Process
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client
+from multiprocessing.connection import Listener
+from timeit import default_timer
+from time import sleep
+
+import numpy as np
+
+from ..GenericLearner import Learner
+
+_FAMILY = "AF_UNIX"
+_SOCKET_NAME = "learner.sock"
+_CONNECT_TIMEOUT = 30.0 # in seconds
+_CONNECT_INTERVAL = 0.01 # in seconds
+
+_STATUS_OK = "ok"
+_STATUS_ERROR = "error"
+
+class RemoteLearner(Learner):
+	"""
+	A proxy to a learner that runs in a learner server
+
+	Parameters
+	-----------
+	remote_learner: str -- name of the learner that runs in the
+	server (any name accepted by TeacherLearnerLoader.get_learner)
+	address: str -- path of the UNIX socket of the server. If None,
+	a server is started in a new process and is shut down by close()
+	**kwargs -- the parameters of the remote learner
+	"""
+	name = "RemoteLearner"
+	uses_ids = True
+
+	def __init__(self, remote_learner: str, address: str = None,
+		**kwargs):
+		self.remote_learner = remote_learner
+		self.address = address
+		self.kwargs = kwargs
+		self._channel = None
+		self._handle = None
+		self.transport_log = []
+
+	def start(self):
+		if self._channel is None:
+			self._channel = _Channel(self.address)
+
+		self._release()
+		self._handle = self._call("create", self.remote_learner,
+			self.kwargs)
+		self.supports_scores = self._call("supports_scores", self._handle)
+		self.supports_feature_importances = self._call(
+			"supports_feature_importances", self._handle)
+
+	def set_dataset(self, X, y):
+		self._channel.share_dataset(X, y)
+		self._call("dataset", self._handle, self._channel.X_desc,
+			self._channel.y_desc)
+
+	def fit(self, X, y, sample_weight = None):
+		return self._call("fit_array", self._handle, X, y, sample_weight)
+
+	def predict(self, X):
+		return self._call("predict_array", self._handle, X)
+
+	def fit_ids(self, ids, sample_weight = None):
+		ids = np.asarray(ids, dtype=np.int64)
+		return self._call("fit", self._handle, ids, sample_weight)
+
+	def predict_ids(self, ids):
+		ids = np.asarray(ids, dtype=np.int64)
+		return self._call("predict", self._handle, ids)
+
+	def predict_with_scores(self, X):
+		return self._call("predict_array_scores", self._handle, X)
+
+	def predict_ids_with_scores(self, ids):
+		ids = np.asarray(ids, dtype=np.int64)
+		return self._call("predict_scores", self._handle, ids)
+
+	def get_feature_importances(self):
+		return self._call("feature_importances", self._handle)
+
+	def get_params(self):
+		params = self._call("params", self._handle)
+		params["remote_learner"] = self.remote_learner
+		params["address"] = self._channel.address
+		return params
+
+	def get_transport_stats(self) -> dict:
+		"""Returns, for each kind of call, the number of calls and
+		the total, server and overhead (total - server) times"""
+		stats = dict()
+		for (cmd, total_time, server_time) in self.transport_log:
+			d = stats.setdefault(cmd, {"qtd_calls": 0, "total_time": 0.0,
+				"server_time": 0.0, "overhead_time": 0.0})
+			d["qtd_calls"] += 1
+			d["total_time"] += total_time
+			d["server_time"] += server_time
+			d["overhead_time"] += total_time - server_time
+
+		return stats
+
+	def close(self):
+		"""Releases the remote learner and, if the server was started
+		by this proxy, shuts it down"""
+		self._release()
+		if self._channel is not None:
+			self._channel.close()
+
+	def _call(self, cmd, *args):
+		t0 = default_timer()
+		result, server_time = self._channel.request(cmd, *args)
+		total_time = default_timer() - t0
+		self.transport_log.append((cmd, total_time, server_time))
+		return result
+
+	def _release(self):
+		if self._handle is not None and self._channel.is_open():
+			self._channel.request("release", self._handle)
+		self._handle = None
+
+	def __deepcopy__(self, memo):
+		# the copy is a new model in the server (a snapshot of the
+		# current one), reached through the same channel
+		other = RemoteLearner.__new__(RemoteLearner)
+		other.remote_learner = self.remote_learner
+		other.address = self.address
+		other.kwargs = deepcopy(self.kwargs, memo)
+		other.supports_scores = self.supports_scores
+		other.supports_feature_importances = self.supports_feature_importances
+		other._channel = self._channel
+		other.transport_log = self.transport_log
+		other._handle = None
+		if self._handle is not None:
+			other._handle = other._call("clone", self._handle)
+
+		return other
+
+	def __getstate__(self):
+		# the model lives in the server, there is nothing to pickle
+		raise TypeError("a RemoteLearner cannot be pickled")
+
+	def __del__(self):
+		try:
+			self._release()
+		except Exception:
+			pass
+
+class _Channel:
+	"""The connection to a learner server, shared by a RemoteLearner
+	and its copies, along with the shared memory blocks"""
+	def __init__(self, address):
+		self._process = None
+		if address is None:
+			address = os.path.join(tempfile.mkdtemp(), _SOCKET_NAME)
+			# the server must share the resource tracker of the client
+			resource_tracker.ensure_running()
+			self._process = Process(target=serve, args=(address, False),
+				daemon=True)
+			self._process.start()
+
+		self.address = address
+		self._conn = _connect(address)
+		self._shms = []
+		self.X_desc = None
+		self.y_desc = None
+
+	def share_dataset(self, X, y):
+		self._unlink()
+		(shm_X, self.X_desc) = _to_shared_memory(X)
+		(shm_y, self.y_desc) = _to_shared_memory(y)
+		self._shms = [shm_X, shm_y]
+
+	def request(self, cmd, *args):
+		self._conn.send((cmd,) + args)
+		(status, result, server_time) = self._conn.recv()
+		if status == _STATUS_ERROR:
+			raise RuntimeError("learner server failed on '{}':\n{}".format(
+				cmd, result))
+
+		return (result, server_time)
+
+	def is_open(self):
+		return self._conn is not None
+
+	def close(self):
+		if self._conn is None:
+			return
+
+		if self._process is not None:
+			self._conn.send(("shutdown",))
+			self._conn.recv()
+			self._process.join()
+		self._conn.close()
+		self._conn = None
+		self._unlink()
+
+	def _unlink(self):
+		for shm in self._shms:
+			shm.close()
+			shm.unlink()
+		self._shms = []
+
+def serve(address: str, untrack_shared_memory: bool = True):
+	"""Runs a learner server at (UNIX socket) address, until a
+	shutdown message. Clients are served one at a time
+
+	Parameters
+	-----------
+	address: str -- path of the UNIX socket
+	untrack_shared_memory: bool -- if True, the shared memory blocks
+	are not unlinked when the server exits (they belong to the client).
+	Should be False if the server shares the resource tracker of the
+	client (it is a child of the client process)
+	"""
+	# late import, TeacherLearnerLoader imports this module
+	from ..Utils.TeacherLearnerLoader import get_learner
+
+	with Listener(address, family=_FAMILY) as listener:
+		running = True
+		while running:
+			with listener.accept() as conn:
+				server = _Server(get_learner, untrack_shared_memory)
+				running = server.run(conn)
+				server.close()
+
+class _Server:
+	def __init__(self, get_learner, untrack_shared_memory):
+		self.get_learner = get_learner
+		self.untrack_shared_memory = untrack_shared_memory
+		self.learners = dict()
+		self.next_handle = 0
+		self.shms = []
+		self.X = None
+		self.y = None
+
+	def run(self, conn) -> bool:
+		"""Answers the requests in conn. Returns False if the server
+		must shut down"""
+		while True:
+			try:
+				msg = conn.recv()
+			except EOFError:
+				return True
+
+			(cmd, args) = (msg[0], msg[1:])
+			if cmd == "shutdown":
+				conn.send((_STATUS_OK, None, 0.0))
+				return False
+
+			t0 = default_timer()
+			try:
+				result = getattr(self, "_cmd_" + cmd)(*args)
+				status = _STATUS_OK
+			except Exception:
+				result = traceback.format_exc()
+				status = _STATUS_ERROR
+			conn.send((status, result, default_timer() - t0))
+
+	def close(self):
+		self.learners.clear()
+		self.close_dataset()
+
+	def _new_handle(self, learner):
+		handle = self.next_handle
+		self.next_handle += 1
+		self.learners[handle] = learner
+		return handle
+
+	def _cmd_create(self, name, kwargs):
+		learner = self.get_learner(name, kwargs)
+		learner.start()
+		return self._new_handle(learner)
+
+	def _cmd_dataset(self, handle, X_desc, y_desc):
+		if self.X is None or self.shms[0].name != X_desc[0]:
+			self.close_dataset()
+			(shm_X, self.X) = _from_shared_memory(X_desc,
+				self.untrack_shared_memory)
+			(shm_y, self.y) = _from_shared_memory(y_desc,
+				self.untrack_shared_memory)
+			self.shms = [shm_X, shm_y]
+
+		learner = self.learners[handle]
+		if learner.uses_ids:
+			learner.set_dataset(self.X, self.y)
+
+	def close_dataset(self):
+		self.X = None
+		self.y = None
+		for shm in self.shms:
+			try:
+				shm.close()
+			except BufferError:
+				pass # some learner still holds a view of the block
+		self.shms = []
+
+	def _cmd_fit(self, handle, ids, sample_weight = None):
+		# the weights are only passed if given: learners that do
+		# not weight the examples keep working
+		learner = self.learners[handle]
+		kwargs = {} if sample_weight is None else {"sample_weight": sample_weight}
+		if learner.uses_ids:
+			learner.fit_ids(ids, **kwargs)
+		else:
+			learner.fit(self.X[ids], self.y[ids], **kwargs)
+
+	def _cmd_predict(self, handle, ids):
+		learner = self.learners[handle]
+		if learner.uses_ids:
+			return learner.predict_ids(ids)
+		return learner.predict(self.X[ids])
+
+	def _cmd_predict_scores(self, handle, ids):
+		learner = self.learners[handle]
+		if learner.uses_ids:
+			return learner.predict_ids_with_scores(ids)
+		return learner.predict_with_scores(self.X[ids])
+
+	def _cmd_supports_scores(self, handle):
+		return self.learners[handle].supports_scores
+
+	def _cmd_supports_feature_importances(self, handle):
+		return self.learners[handle].supports_feature_importances
+
+	def _cmd_feature_importances(self, handle):
+		return self.learners[handle].get_feature_importances()
+
+	def _cmd_fit_array(self, handle, X, y, sample_weight = None):
+		kwargs = {} if sample_weight is None else {"sample_weight": sample_weight}
+		self.learners[handle].fit(X, y, **kwargs)
+
+	def _cmd_predict_array(self, handle, X):
+		return self.learners[handle].predict(X)
+
+	def _cmd_predict_array_scores(self, handle, X):
+		return self.learners[handle].predict_with_scores(X)
+
+	def _cmd_clone(self, handle):
+		return self._new_handle(deepcopy(self.learners[handle]))
+
+	def _cmd_release(self, handle):
+		self.learners.pop(handle, None)
+
+	def _cmd_params(self, handle):
+		return self.learners[handle].get_params()
+
+def _connect(address):
+	t0 = default_timer()
+	while True:
+		try:
+			return Client(address, family=_FAMILY)
+		except (FileNotFoundError, ConnectionRefusedError):
+			if default_timer() - t0 > _CONNECT_TIMEOUT:
+				raise
+			sleep(_CONNECT_INTERVAL)
+
+def _to_shared_memory(v):
+	v = np.ascontiguousarray(v)
+	shm = shared_memory.SharedMemory(create=True, size=max(v.nbytes, 1))
+	v_shm = np.ndarray(v.shape, dtype=v.dtype, buffer=shm.buf)
+	v_shm[...] = v
+	return (shm, (shm.name, v.shape, v.dtype.str))
+
+def _from_shared_memory(desc, untrack):
+	(name, shape, dtype) = desc
+	shm = shared_memory.SharedMemory(name=name)
+	if untrack:
+		# the block belongs to the client, that unlinks it
+		resource_tracker.unregister(shm._name, "shared_memory")
+	v = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+	return (shm, v)
@@ -0,0 +1,77 @@
+from ..GenericLearner import Learner
+from ..GenericLearner import get_scores_by_class
+from sklearn.linear_model import SGDClassifier
+import numpy as np
+
+class SGDLearner(Learner):
+	"""
+	A linear model trained by stochastic gradient descent (sklearn's
+	SGDClassifier, hinge loss by default, log_loss for a logistic
+	regression). Incremental: in each iteration, it is updated with
+	one pass over the new examples
+
+	Parameters
+	-----------
+	passes: int -- number of passes over the accumulated examples
+	after each update (0: the cost of an update depends only on the
+	new examples)
+	args, kwargs -- the parameters of the SGDClassifier
+	"""
+	name = "SGDLearner"
+	supports_scores = True
+	supports_feature_importances = True
+	incremental = True
+	_PASSES = 0
+
+	def __init__(self, *args, passes: int = _PASSES, **kwargs):
+		self.args = args
+		self.kwargs = kwargs
+		self.passes = passes
+
+		assert passes >= 0, "passes must be non negative"
+
+	def start(self):
+		self.model = SGDClassifier(*self.args, **self.kwargs)
+		self.classes = None
+		# the accumulated examples (only kept if passes > 0)
+		self.seen = []
+
+	def set_classes(self, classes):
+		self.classes = np.asarray(classes)
+
+	def fit(self, X, y, sample_weight = None):
+		return self.model.fit(X, y, sample_weight=sample_weight)
+
+	def partial_fit(self, X, y, sample_weight = None):
+		classes = self.classes if self.classes is not None else np.unique(y)
+		self.model.partial_fit(X, y, classes=classes,
+			sample_weight=sample_weight)
+		if self.passes == 0:
+			return
+
+		if sample_weight is None:
+			sample_weight = np.ones(len(y))
+		self.seen.append((X, y, sample_weight))
+		(X_seen, y_seen, weights_seen) = (np.concatenate(v)
+			for v in zip(*self.seen))
+		self.seen = [(X_seen, y_seen, weights_seen)]
+		for __ in range(self.passes):
+			self.model.partial_fit(X_seen, y_seen, sample_weight=weights_seen)
+
+	def predict(self, X):
+		return self.model.predict(X)
+
+	def predict_with_scores(self, X):
+		scores = get_scores_by_class(self.model.decision_function(X),
+			self.model.classes_)
+		labels = np.argmax(scores, axis=1).astype(self.model.classes_.dtype)
+		return (labels, scores)
+
+	def get_feature_importances(self):
+		# magnitude of the coefficients, summed over the classes
+		return np.abs(np.atleast_2d(self.model.coef_)).sum(axis=0)
+
+	def get_params(self):
+		params = self.model.get_params()
+		params["passes"] = self.passes
+		return params
@@ -1,9 +1,12 @@
 from ..GenericLearner import Learner
+from ..GenericLearner import get_scores_by_class
 from sklearn.svm import LinearSVC
 import numpy as np
 
 class SVMLinearLearner(Learner):
 	name = "SVMLinearLearner"
+	supports_scores = True
+	supports_feature_importances = True
 
 	def __init__(self, *args, **kwargs):
 		self.args = args
@@ -12,11 +15,21 @@ class SVMLinearLearner(Learner):
 	def start(self):
 		self.model = LinearSVC(*self.args, **self.kwargs)
 
-	def fit(self, X, y):
-		return self.model.fit(X, y)
+	def fit(self, X, y, sample_weight = None):
+		return self.model.fit(X, y, sample_weight=sample_weight)
 
 	def predict(self, X):
 		return self.model.predict(X)
 
+	def predict_with_scores(self, X):
+		scores = get_scores_by_class(self.model.decision_function(X),
+			self.model.classes_)
+		labels = np.argmax(scores, axis=1).astype(self.model.classes_.dtype)
+		return (labels, scores)
+
+	def get_feature_importances(self):
+		# magnitude of the coefficients, summed over the classes
+		return np.abs(np.atleast_2d(self.model.coef_)).sum(axis=0)
+
 	def get_params(self):
 		return self.model.get_params()
\ No newline at end of file
@@ -2,4 +2,8 @@ from .LogisticRegressionLearner import LogisticRegressionLearner
 from .RandomForestLearner import RandomForestLearner
 from .SVMLinearLearner import SVMLinearLearner
 from .LGBMLearner import LGBMLearner
-from .DecisionTreeLearner import DecisionTreeLearner
\ No newline at end of file
+from .DecisionTreeLearner import DecisionTreeLearner
+from .SGDLearner import SGDLearner
+from .NaiveBayesLearner import NaiveBayesLearner
+from .RemoteLearner import RemoteLearner
+from .ColumnSubsetLearner import ColumnSubsetLearner
\ No newline at end of file
@@ -28,9 +28,21 @@ from sklearn.utils import shuffle
 
 from .Utils.Timer import Timer
 from .Utils.TeachResult import TeachResult
+from .Utils.ModelCache import ModelCache
+from .Utils.TeachTrace import TeachTrace
+from .Utils.EvalSchedule import get_eval_schedule
+from .Utils.Fingerprint import get_dataset_fingerprint
+from .Utils.Deduplication import Deduplication
+from .Utils.ProtocolSteps import run_tests
+from .Utils.ProtocolSteps import update_columns
+from .Utils.ProtocolSteps import fit
+from .Utils.ProtocolSteps import partial_fit
+from .Utils.ProtocolSteps import get_sample_weight
+from .Utils.ProtocolSteps import predict
 
 from .GenericTeacher import Teacher
 from .GenericLearner import Learner
+from .Learners.ColumnSubsetLearner import ColumnSubsetLearner
 
 from .Definitions import InputSpace
 from .Definitions import Labels
@@ -38,6 +50,9 @@ from .Definitions import wrapp_labels
 from .Definitions import wrapp_input_space
 from .Definitions import get_qtd_columns
 from .Definitions import get_qtd_rows
+from .Definitions import get_ids_dtype
+from .Definitions import wrapp_ids
+from .Definitions import compact_labels
 
 from copy import deepcopy 
 
@@ -46,9 +61,17 @@ _TIMER_KEYS = ("training", "classification", "get_examples")
 _LOG_HEADER = ("iter", "TS_size", "dataset_accuracy", "elapsed_time",
 	"time_left", "get_examples_time", "training_time",
 	"classification_time", "qtd_classified_examples", "TS_qtd_classes",
-	"TS_class_distribution", "test_set_accuracy", "estimated_accuracy", "validation_set_size", "learner_selected", "accuracy_selected")
+	"TS_class_distribution", "test_set_accuracy", "estimated_accuracy", "validation_set_size", "learner_selected", "accuracy_selected",
+	"cache_hit", "qtd_active_columns")
 
 _IND_TEST_ACC = _LOG_HEADER.index('test_set_accuracy')
+_IND_ACC_SELECTED = _LOG_HEADER.index('accuracy_selected')
+_IND_SELECTED = _LOG_HEADER.index('learner_selected')
+_IND_DATASET_ACC = _LOG_HEADER.index('dataset_accuracy')
+
+_MISSING = '-' # value of the log columns that were not evaluated
+
+_REPLAY_LOG_HEADER = ("iter", "TS_size", "elapsed_time", "training_time")
 
 
 
@@ -63,7 +86,78 @@ def teach(T: Teacher, L: Learner,
 	dataset_name = TeachResult._DATASET_STD_NAME,
 	time_limit = _TIME_LIMIT,
 	join_sets = True,
-	save_best_learner = False) -> TeachResult:
+	save_best_learner = False,
+	model_cache = None,
+	trace = None,
+	eval_schedule = None,
+	deduplicate = False):
+	"""
+	Performs the interactions between teacher T and learner L
+	over the dataset (X, X_labels) and returns a TeachResult
+
+	time_limit -- a time limit (in seconds) or a list of time limits.
+	For a list, the teaching runs once, with the largest limit, and
+	a list of TeachResult is returned, one for each limit, as if
+	each limit were run separately: the log is cut at the limit and
+	the learner is the one that would have been selected at the cut.
+	Only valid for teachers that do not use time_left to make choices
+	(every learner selected is kept in memory until the end)
+
+	model_cache -- an optional ModelCache (or the path of its folder).
+	If provided, fitted learners are loaded from the cache, instead
+	of being fitted again, whenever the learner configuration,
+	the dataset and the set of training ids are the same
+
+	trace -- an optional TeachTrace (or the path of a file). If provided,
+	the sequence of ids exchanged between T and L is recorded in it
+	(and saved in the file), so that it can be replayed (see replay)
+
+	eval_schedule -- in which iterations the learner is evaluated (its
+	accuracies are computed) to build the log line: every iteration
+	(None), every k iterations, geometric or time spaced iterations,
+	or a callable (see Utils.EvalSchedule). The first and the last
+	iterations are always evaluated. The other lines only log times,
+	with the accuracies marked as missing. With save_best_learner,
+	only evaluated iterations can be selected
+
+	If the teacher chooses the columns (uses_column_mask), the learner
+	is wrapped in a ColumnSubsetLearner: each model is fitted, and
+	applied, with the columns chosen before its fit. The number of
+	columns of the model of each iteration is logged (and the columns
+	of each fit are recorded in the trace)
+
+	If the teacher weights the examples (uses_sample_weight), each fit
+	gets the weights of the training examples (see
+	Teacher.get_sample_weight). The weights are part of the model_cache
+	key and are recorded in the trace
+
+	deduplicate -- whether the duplicate examples (equal rows with the
+	same label) are collapsed before the teaching (see
+	Utils.Deduplication). T and L work over the unique examples, each
+	fit is weighted by the multiplicities of its examples (times the
+	weights of the teacher) and the accuracies over the dataset are
+	still the accuracies over the original rows. The accuracy of the
+	TeachResult is still the estimate of the teacher (made over the
+	unique examples it tested; for the teachers with no estimate of
+	their own, the accuracy over the original rows). The ids of the
+	TeachResult are rows of X, the ids of the trace are unique examples
+	(the trace records their rows and multiplicities, see replay)
+
+	If the learner is incremental (and join_sets is True), it is
+	updated, in each iteration, with the new examples only (see
+	Learner.partial_fit), and the fitted models are not cached (they
+	depend on the order of the examples, not only on the training set)
+	"""
+	# multi-budget mode: a single run, with the largest time limit
+	time_limits = None
+	if isinstance(time_limit, (list, tuple)):
+		time_limits = list(time_limit)
+		time_limit = max(time_limits)
+	snapshots = dict() # iteration -> (timer, train ids, learner, estimate)
+	if time_limits is not None:
+		pending_limits = sorted(time_limits) # not reached yet
+		kept = set() # iterations whose learners are kept
+
 	# timer
 	timer = Timer()
 	ok_timer = None
@@ -73,36 +167,91 @@ def teach(T: Teacher, L: Learner,
 
 	# teacher log
 	log = [_LOG_HEADER] # not being used so far
-	test_ids = np.array([], dtype=int)
+	eval_schedule = get_eval_schedule(eval_schedule)
 
 	# wrappers
 	X = wrapp_input_space(X)
 	X_labels = wrapp_labels(X_labels)
+	m = get_qtd_rows(X)
 
 	# checks
-	assert len(np.unique(X_labels)) > 1 # there must be more than one class in the dataset
+	classes = np.unique(X_labels)
+	assert len(classes) > 1 # there must be more than one class in the dataset
 	assert np.min(X_labels) == 0
 
+	# dtype policy: compact labels and ids
+	X_labels = compact_labels(X_labels, classes[-1] + 1)
+	if X_test_labels is not None:
+		X_test_labels = compact_labels(wrapp_labels(X_test_labels),
+			classes[-1] + 1)
+
+	# duplicate examples collapsed (optional)
+	dedup = None
+	multiplicity = None
+	if deduplicate:
+		dedup = Deduplication(X, X_labels)
+		X = X[dedup.ids]
+		X_labels = X_labels[dedup.ids]
+		multiplicity = dedup.multiplicity
+		m = get_qtd_rows(X)
+
+	test_ids = np.array([], dtype=get_ids_dtype(m))
+
 	# start with empty set of <training example ids>
-	train_ids = np.array([], dtype=int)
+	train_ids = np.array([], dtype=get_ids_dtype(m))
 	ok_train_ids = None
 
+	# the teacher may choose the columns used by the learner
+	if T.uses_column_mask:
+		L = ColumnSubsetLearner(L)
+
 	# initialization
 	L.start()
+	if L.uses_ids:
+		L.set_dataset(X, X_labels)
+	# incremental learners are updated with the new examples only
+	incremental = L.incremental and join_sets
+	if incremental:
+		L.set_classes(classes)
 	T.start(X, X_labels, get_time_left())
 
+	# fitted models cache (optional)
+	if isinstance(model_cache, str):
+		model_cache = ModelCache(model_cache)
+	dataset_fingerprint = None
+	if model_cache is not None:
+		dataset_fingerprint = get_dataset_fingerprint(X, X_labels)
+
+	# teaching trace (optional)
+	trace_path = None
+	if isinstance(trace, str):
+		trace_path = trace
+		trace = TeachTrace(m, join_sets)
+	if trace is not None and dedup is not None:
+		trace.set_unique_rows(dedup.ids, dedup.multiplicity,
+			dedup.inverse.size)
+
 	# first teaching interaction
 
 	## get first examples
 	timer.tick("get_examples")
-	new_train_ids = T.get_first_examples(get_time_left())
+	new_train_ids = wrapp_ids(T.get_first_examples(get_time_left()), m)
 	assert 0 < len(new_train_ids) <=  get_qtd_rows(X)
 	timer.tock()
 
+	if trace is not None:
+		trace.set_first_examples(new_train_ids)
+
 	## fit first examples
 	train_ids = np.append(train_ids, new_train_ids)
+	timer.tick("get_examples")
+	sample_weight = get_sample_weight(T, train_ids, multiplicity, trace)
+	timer.tock()
+	_record_columns(trace, L, X)
 	timer.tick("training")
-	L.fit(X[train_ids], X_labels[train_ids])
+	(cache_key, cache_hit, h) = _fit_or_load(L, X, X_labels, train_ids,
+		model_cache, dataset_fingerprint, sample_weight,
+		new_train_ids if incremental else None)
 	timer.tock()
 
 	best_accuracy = 0
@@ -112,30 +261,55 @@ def teach(T: Teacher, L: Learner,
 	# other teaching interactions
 	qtd_iters = 0
 	while (get_time_left() > 0):
-		# copy last "ok" state and build log line
+		# copy last "ok" state
 		qtd_iters += 1		
 		timer.stop()
 		ok_timer = copy(timer)
 		ok_timer.finish()
 		ok_train_ids = train_ids[:]
-		_log_line = _get_log_line(L, X, X_labels, X_test, X_test_labels, 
-			ok_train_ids, test_ids, ok_timer, get_time_left(), qtd_iters)
-		if not save_best_learner:
-			iter_selected_learner = qtd_iters
-			log.append(_log_line+(0,0,qtd_iters, _log_line[_IND_TEST_ACC]))
+		ok_time_left = get_time_left()
+		last_test_ids = test_ids
 		timer.unstop()
 
-
-
 		# run next iteration
 		timer.tick("classification")
-		test_ids, test_labels = _run_tests(T, L, X, get_time_left)
+		test_ids, test_labels, test_scores = run_tests(T, L, X, get_time_left)
 		timer.tock()
 		
 		timer.tick("get_examples")
-		new_train_ids = T.get_new_examples(test_ids, test_labels, get_time_left())
+		if T.uses_scores:
+			new_train_ids = T.get_new_examples(test_ids, test_labels,
+				get_time_left(), test_scores=test_scores)
+		else:
+			new_train_ids = T.get_new_examples(test_ids, test_labels, get_time_left())
+		new_train_ids = wrapp_ids(new_train_ids, m)
+		if T.uses_column_mask and len(new_train_ids) > 0:
+			update_columns(T, L, get_time_left())
 		timer.tock()
 
+		if trace is not None:
+			trace.add_iteration(test_ids, new_train_ids)
+
+		# build log line (L is the same as in the beginning of the iteration)
+		timer.stop()
+		evaluate = eval_schedule(qtd_iters, ok_timer.get_elapsed_time())
+		evaluate = (evaluate or qtd_iters == 1 or len(new_train_ids) == 0
+			or get_time_left() <= 0) # last iteration
+		if evaluate:
+			if h is None:
+				h = predict(L, X)
+				if cache_key is not None:
+					model_cache.save(cache_key, L, h)
+			_log_line = _get_log_line(L, h, X_labels, X_test, X_test_labels, 
+				ok_train_ids, last_test_ids, ok_timer, ok_time_left, qtd_iters,
+				multiplicity)
+		else:
+			if h is None and cache_key is not None and not cache_hit:
+				model_cache.save(cache_key, L)
+			_log_line = _get_timing_log_line(X_labels, ok_train_ids,
+				last_test_ids, ok_timer, ok_time_left, qtd_iters)
+		timer.unstop()
+
 		if save_best_learner: 
 			#in which case the learner is trained with all the examples and cannot be evaluated.			
 			if len(new_train_ids) == 0:
@@ -143,10 +317,16 @@ def teach(T: Teacher, L: Learner,
 				current_accuracy = 2.0
 			else:	
 				current_accuracy = T._get_accuracy()
-				current_accuracy -= 1.96*np.sqrt(current_accuracy*(1-current_accuracy)/len(test_ids))
+				if current_accuracy is not None:
+					current_accuracy -= 1.96*np.sqrt(current_accuracy*(1-current_accuracy)/len(test_ids))
+				elif evaluate:
+					# the teacher has no estimate: the accuracy of h (as in _get_teacher_accuracy)
+					current_accuracy = _get_teacher_accuracy(None, h, X_labels, multiplicity)
+				else:
+					current_accuracy = _MISSING
 			
 
-			if (current_accuracy + 0.0000001 >= best_accuracy):
+			if evaluate and (current_accuracy + 0.0000001 >= best_accuracy):
 				best_accuracy = current_accuracy
 				final_learner = deepcopy(L)
 				iter_selected_learner = qtd_iters
@@ -156,30 +336,68 @@ def teach(T: Teacher, L: Learner,
 				selected_accuracy = _log_line[_IND_TEST_ACC]				
 			else:
 				selected_accuracy = log[iter_selected_learner][_IND_TEST_ACC]
-			_log_line = _log_line + (current_accuracy,len(test_ids), iter_selected_learner, selected_accuracy)
+			_log_line = _log_line + (current_accuracy,len(test_ids), iter_selected_learner, selected_accuracy,
+				int(cache_hit), _get_qtd_active_columns(L, X))
 			log.append(_log_line)
 		else:
 			final_learner = deepcopy(L)
-
+			iter_selected_learner = qtd_iters
+			log.append(_log_line+(0,0,qtd_iters, _log_line[_IND_TEST_ACC],
+				int(cache_hit), _get_qtd_active_columns(L, X)))
+
+		if time_limits is not None:
+			learner_i = final_learner if iter_selected_learner == qtd_iters else None
+			snapshots[qtd_iters] = (ok_timer, ok_train_ids, learner_i,
+				T._get_accuracy())
+
+			# the limits reached before this iteration get the learner
+			# selected in the last one, the other limits get the learner
+			# selected now or a later one: the other learners are released
+			while (qtd_iters > 1 and len(pending_limits) > 0 and
+				pending_limits[0] <= ok_timer.get_elapsed_time()):
+				pending_limits.pop(0)
+				kept.add(log[qtd_iters - 1][_IND_SELECTED])
+			for (i, snapshot) in snapshots.items():
+				if (snapshot[2] is not None and i not in kept and
+					i != iter_selected_learner):
+					snapshots[i] = snapshot[:2] + (None,) + snapshot[3:]
 
 
 		if len(new_train_ids) > 0:
 			
-			timer.tick("training")
 			if join_sets:
 				train_ids = np.append(train_ids, new_train_ids)
 			else:
 				train_ids = new_train_ids
 
 			assert len(train_ids) <= get_qtd_rows(X)
+
+			timer.tick("get_examples")
+			sample_weight = get_sample_weight(T, train_ids, multiplicity, trace)
+			timer.tock()
+			_record_columns(trace, L, X)
 			
-			L.fit(X[train_ids], X_labels[train_ids])
+			timer.tick("training")
+			(cache_key, cache_hit, h) = _fit_or_load(L, X, X_labels,
+				train_ids, model_cache, dataset_fingerprint, sample_weight,
+				new_train_ids if incremental else None)
 			timer.tock()
 			
 		else:
 			break
 
 
+	if trace_path is not None:
+		trace.save(trace_path)
+
+	# the last line is always evaluated. If the time was over during the
+	# last training, it was not, but its learner is the final learner
+	# (unless save_best_learner, which only selects evaluated learners)
+	if (qtd_iters >= 1 and not save_best_learner and
+		log[-1][_IND_DATASET_ACC] == _MISSING):
+		log[-1] = _evaluate_log_line(log[-1], final_learner, X, X_labels,
+			X_test, X_test_labels, multiplicity)
+
 	# # acurácia no conjunto de teste
 	if X_test is not None:
 		ind_acc = log[0].index('accuracy_selected')
@@ -192,12 +410,26 @@ def teach(T: Teacher, L: Learner,
 	assert ok_timer is not None
 	assert ok_train_ids is not None
 	assert len(ok_train_ids) == len(set(ok_train_ids))
+
+	if time_limits is not None:
+		return [_get_time_limit_teach_result(T, X, X_labels, X_test,
+			X_test_labels, log, snapshots, time_limit_i, dataset_name, dedup)
+			for time_limit_i in time_limits]
 	
 	# monta o teaching result
 	# # hipótese final do learner
 	L = final_learner
-	h = L.predict(X) 
+	h = predict(L, X)
+
+	# # estimada pelo teacher (a mesma com ou sem deduplicate)
+	accuracy = _get_teacher_accuracy(T._get_accuracy(), h, X_labels,
+		multiplicity)
 
+	# # sobre as linhas originais do dataset
+	if dedup is not None:
+		h = dedup.expand(h)
+		ok_train_ids = dedup.ids[ok_train_ids]
+		X_labels = dedup.expand(X_labels)
 
 	# # qtd classes e distribuicao das classes no dataset
 	qtd_classes, dist_classes = _get_class_qtd_and_distribution(X_labels)
@@ -205,30 +437,149 @@ def teach(T: Teacher, L: Learner,
 
 	return TeachResult(T, L, ok_train_ids, h, ok_timer, qtd_iters,
 		get_qtd_columns(X), log, time_limit, qtd_classes,
-		dist_classes, test_set_accuracy, dataset_name)
+		dist_classes, test_set_accuracy, dataset_name, accuracy)
+
+def _get_time_limit_teach_result(T: Teacher, X: InputSpace,
+	X_labels: Labels, X_test: InputSpace, X_test_labels: Labels,
+	log, snapshots, time_limit: float, dataset_name: str,
+	dedup: Deduplication = None) -> TeachResult:
+	"""Builds the TeachResult of a (single) run with the given time
+	limit from the log and the snapshots of a run with a larger limit
+	(over the unique examples of dedup, if given)"""
+	multiplicity = dedup.multiplicity if dedup is not None else None
+	ind_elapsed_time = _LOG_HEADER.index("elapsed_time")
+	ind_selected = _LOG_HEADER.index("learner_selected")
+	ind_acc = _LOG_HEADER.index("accuracy_selected")
+
+	# last iteration started before the time limit (there is at least one)
+	qtd_iters = 1
+	while (qtd_iters + 1 < len(log) and
+		log[qtd_iters + 1][ind_elapsed_time] < time_limit):
+		qtd_iters += 1
+
+	(timer, train_ids, __, estimate) = snapshots[qtd_iters]
+	L = snapshots[log[qtd_iters][ind_selected]][2]
+	assert L is not None, "the learner of the limit was released"
+	h = predict(L, X)
+
+	# the last line may not have been evaluated (see eval_schedule)
+	log = log[:qtd_iters + 1]
+	if (log[-1][_IND_DATASET_ACC] == _MISSING and
+		log[-1][ind_selected] == qtd_iters):
+		log[-1] = _evaluate_log_line(log[-1], L, X, X_labels,
+			X_test, X_test_labels, multiplicity)
+
+	# the accuracy of a single run (see TeachResult): the estimate of
+	# the teacher at the cut
+	accuracy = _get_teacher_accuracy(estimate, h, X_labels, multiplicity)
+
+	if dedup is not None:
+		h = dedup.expand(h)
+		train_ids = dedup.ids[train_ids]
+		X_labels = dedup.expand(X_labels)
+
+	test_set_accuracy = log[-1][ind_acc] if X_test is not None else -1
+	qtd_classes, dist_classes = _get_class_qtd_and_distribution(X_labels)
+
+	return TeachResult(T, L, train_ids, h, timer, qtd_iters,
+		get_qtd_columns(X), log, time_limit, qtd_classes,
+		dist_classes, test_set_accuracy, dataset_name, accuracy)
+
+def replay(trace, L: Learner, X: InputSpace, X_labels: Labels):
+	"""
+	Fits the learner L with the sequence of training sets recorded
+	in trace (a TeachTrace or the path of a file saved by teach), with
+	no teacher and no test phase. Useful to compare learners under
+	exactly the same curriculum. An incremental learner is updated
+	with the new examples of each iteration, as in teach
+
+	X, X_labels -- the dataset given to teach. If the trace was
+	recorded with deduplicate, the learner is fitted with the unique
+	examples of the trace, weighted by their multiplicities. If the
+	teacher weighted the examples, each fit gets the recorded weights.
+	If the teacher chose the columns, L is wrapped in a
+	ColumnSubsetLearner and each fit uses the recorded columns (the
+	wrapper is returned)
+
+	Returns (L, log), where log has one line per fit, with the
+	training set size and the time spent fitting
+	"""
+	if isinstance(trace, str):
+		trace = TeachTrace.load(trace)
+
+	X = wrapp_input_space(X)
+	X_labels = wrapp_labels(X_labels)
+	assert get_qtd_rows(X) == trace.qtd_rows, "the trace was recorded with another dataset"
+	X_labels = compact_labels(X_labels)
+	multiplicity = None
+	if trace.is_deduplicated():
+		X = X[trace.rows]
+		X_labels = X_labels[trace.rows]
+		multiplicity = trace.multiplicity
 
-def _run_tests(T: Teacher, L: Learner,
-	X: InputSpace, get_time_left):
-	test_ids = np.array([], dtype=int)
-	test_labels = np.array([], dtype=int)
+	timer = Timer()
+	timer.start()
+	_set_timer_keys_to_zero(timer, ("training",))
+	log = [_REPLAY_LOG_HEADER]
 
-	while len(test_ids) <= get_qtd_rows(X):
-		new_test_ids = T.get_new_test_ids(test_ids, test_labels, get_time_left())
-		if len(new_test_ids) > 0:
-			assert len(new_test_ids) + len(test_ids) <= get_qtd_rows(X)
+	if trace.has_columns():
+		L = ColumnSubsetLearner(L)
+	L.start()
+	if L.uses_ids:
+		L.set_dataset(X, X_labels)
+	incremental = L.incremental and trace.join_sets
+	if incremental:
+		L.set_classes(np.unique(X_labels))
+
+	train_ids = trace.first_ids
+	new_train_ids = train_ids
+	for qtd_iters in range(1, trace.get_qtd_iters() + 2):
+		sample_weight = None
+		if trace.is_weighted():
+			sample_weight = trace.sample_weights[qtd_iters - 1]
+		if multiplicity is not None:
+			counts = multiplicity[train_ids].astype(np.float64)
+			sample_weight = counts if sample_weight is None else sample_weight * counts
+		if trace.has_columns():
+			L.set_columns(trace.columns[qtd_iters - 1])
+		timer.tick("training")
+		_fit_or_load(L, X, X_labels, train_ids, None, None, sample_weight,
+			new_train_ids if incremental else None)
+		timer.tock()
+		log.append((qtd_iters, len(train_ids), timer.get_elapsed_time(),
+			timer["training"]))
 
-			new_test_labels = L.predict(X[new_test_ids])
-			test_ids = np.append(test_ids, new_test_ids)
-			test_labels = np.append(test_labels, new_test_labels)
-		else:
+		if qtd_iters > trace.get_qtd_iters():
 			break
-	return (test_ids, test_labels)
 
-def _get_log_line(L: Learner,
-	X: InputSpace, X_labels: Labels, 
+		new_train_ids = trace.new_train_ids[qtd_iters - 1]
+		if len(new_train_ids) == 0:
+			break
+		elif trace.join_sets:
+			train_ids = np.append(train_ids, new_train_ids)
+		else:
+			train_ids = new_train_ids
+
+	return (L, log)
+
+def _record_columns(trace: TeachTrace, L: Learner, X: InputSpace):
+	# the columns of the next fit, if the teacher chooses them
+	if trace is not None and isinstance(L, ColumnSubsetLearner):
+		columns = L.next_columns
+		if columns is None:
+			columns = np.arange(get_qtd_columns(X))
+		trace.add_columns(columns)
+
+def _get_qtd_active_columns(L: Learner, X: InputSpace) -> int:
+	if isinstance(L, ColumnSubsetLearner):
+		return L.get_qtd_active_columns()
+	return get_qtd_columns(X)
+
+def _get_log_line(L: Learner, h: Labels, X_labels: Labels, 
 	X_test: InputSpace, X_test_labels: Labels,
-	train_ids, test_ids, timer, time_left, qtd_iters):
-	accuracy = _get_accuracy(L.predict(X), X_labels)
+	train_ids, test_ids, timer, time_left, qtd_iters, multiplicity = None):
+	# h -- how L classifies the whole dataset
+	accuracy = _get_accuracy(h, X_labels, multiplicity)
 	qtd_classes, dist_classes = _get_class_qtd_and_distribution(X_labels[train_ids])
 	
 	if X_test is not None:
@@ -253,6 +604,67 @@ def _get_log_line(L: Learner,
 
 	return log_line
 
+def _fit_or_load(L: Learner, X: InputSpace, X_labels: Labels, ids,
+	model_cache, dataset_fingerprint, sample_weight = None, new_ids = None):
+	"""Fits L with the examples ids or, if possible, loads the fitted
+	model from model_cache. Returns (cache_key, cache_hit, h), where
+	h are the cached predictions of L over X (or None). If new_ids
+	(the last examples of ids) is given, L is incremental and is
+	only updated with them"""
+	if new_ids is not None:
+		if sample_weight is not None:
+			sample_weight = sample_weight[len(ids) - len(new_ids):]
+		partial_fit(L, X, X_labels, new_ids, sample_weight)
+		return (None, False, None)
+
+	if model_cache is None:
+		fit(L, X, X_labels, ids, sample_weight)
+		return (None, False, None)
+
+	cache_key = model_cache.get_key(L, dataset_fingerprint, ids,
+		sample_weight)
+	(cache_hit, h) = model_cache.load(cache_key, L)
+	if not cache_hit:
+		# saved along with its predictions, when the log line is built
+		fit(L, X, X_labels, ids, sample_weight)
+
+	return (cache_key, cache_hit, h)
+
+def _get_timing_log_line(X_labels: Labels, train_ids, test_ids, timer,
+	time_left, qtd_iters):
+	# the same as _get_log_line, without the accuracies
+	qtd_classes, dist_classes = _get_class_qtd_and_distribution(X_labels[train_ids])
+	log_line = (
+		qtd_iters,
+		len(train_ids),
+		_MISSING,
+		timer.get_elapsed_time(),
+		time_left,
+		timer["get_examples"],
+		timer["training"],
+		timer["classification"],
+		len(test_ids),
+		qtd_classes,
+		dist_classes,
+		_MISSING
+	)
+
+	return log_line
+
+def _evaluate_log_line(log_line, L: Learner, X: InputSpace, X_labels: Labels,
+	X_test: InputSpace, X_test_labels: Labels, multiplicity = None):
+	# fills the accuracies of a line built by _get_timing_log_line,
+	# with the learner L of the line (that was selected)
+	log_line = list(log_line)
+	log_line[_IND_DATASET_ACC] = _get_accuracy(
+		predict(L, X), X_labels, multiplicity)
+	if X_test is not None:
+		log_line[_IND_TEST_ACC] = _get_accuracy(L.predict(X_test), X_test_labels)
+	else:
+		log_line[_IND_TEST_ACC] = '-'
+	log_line[_IND_ACC_SELECTED] = log_line[_IND_TEST_ACC]
+	return tuple(log_line)
+
 def _get_class_qtd_and_distribution(labels):
 	qtd_classes = len(np.unique(labels))
 	dist_classes = np.bincount(labels) / len(labels)
@@ -264,8 +676,20 @@ def _set_timer_keys_to_zero(timer, keys):
 		timer.tick(key)
 		timer.tock()
 
-def _get_accuracy(y, h):
+def _get_teacher_accuracy(estimate, h, y, multiplicity = None):
+	"""The accuracy of a TeachResult: the estimate of the teacher (see
+	Teacher._get_accuracy) or, if the teacher has none, the accuracy
+	of h over the dataset"""
+	if estimate is not None:
+		return estimate
+	return _get_accuracy(y, h, multiplicity)
+
+def _get_accuracy(y, h, multiplicity = None):
+	# multiplicity -- the number of rows of each (unique) example
 	assert len(y) == len(h)
+	if multiplicity is not None:
+		qtd_wrong_labels = np.sum(multiplicity[y != h])
+		return 1 - qtd_wrong_labels / np.sum(multiplicity)
 	qtd_wrong_labels = np.count_nonzero(y != h)
 	accuracy = 1 - qtd_wrong_labels / len(y)
 	return accuracy
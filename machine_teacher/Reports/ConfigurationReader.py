@@ -6,7 +6,9 @@ from ..Utils.CustomIterator import CustomIterator
 _SECTIONS = ('teacher', 'learner', 'dataset', 'destination')
 _DATASET_SUPERSET_SECTION = {'path', 'path_teste', 'scale',
 							 'is_numeric', 'shuffle_dataset'}
-_PROTOCOL_SUPERSET_SECTION = {'time_limit', 'join_sets','save_best_learner'}
+_PROTOCOL_SUPERSET_SECTION = {'time_limit', 'join_sets','save_best_learner',
+							  'model_cache', 'eval_schedule', 'deduplicate'}
+_PROTOCOL_LIST_PARAMETERS = {'time_limit'} # a list of time limits runs all of them at once
 
 class _TestConfiguration:
 	def __init__(self, teacher_name: str, learner_name: str,
@@ -182,6 +184,10 @@ def _parse_protocol_section(section):
 	for (key, val) in dict(section).items():
 		val = _parse_value(val)
 
+		if key in _PROTOCOL_LIST_PARAMETERS and len(val) > 1:
+			kwargs[key] = val
+			continue
+
 		assert len(val) == 1, "protocol parameters does not support lists"
 
 		val = val[0]
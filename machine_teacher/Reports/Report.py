@@ -61,13 +61,14 @@ def create_reports_from_configuration_folder(folder_path,
 			new_folder_path, verbose)
 		all_TRs = all_TRs + TRs_i
 		
-		# get average result
-		avg_TR = TRs_i[0]
-		for TR in TRs_i[1:]:
-			avg_TR += TR
-		avg_TR *= 1/len(TRs_i)
+		# get average result (one for each time limit)
+		for TRs_i_t in _group_by_time_limit(TRs_i):
+			avg_TR = TRs_i_t[0]
+			for TR in TRs_i_t[1:]:
+				avg_TR += TR
+			avg_TR *= 1/len(TRs_i_t)
 		
-		TRs.append(avg_TR)
+			TRs.append(avg_TR)
 
 	return (new_folder_path, all_TRs)
 
@@ -99,11 +100,16 @@ def create_reports_from_configuration_file(src_path: str,
 		TR_i = teach(T, L, copy(X), copy(y), copy(X_test), copy(y_test),
 			dataset_name=dataset_name,
 			**protocol_kwargs)
-		TRs.append(TR_i)
+
+		# a list of time limits gives a list of results
+		if not isinstance(TR_i, list):
+			TR_i = [TR_i]
+		TRs.extend(TR_i)
 
 		if verbose:
-			print("-"*20)
-			print(TR_i.main_infos)
+			for TR_ij in TR_i:
+				print("-"*20)
+				print(TR_ij.main_infos)
 
 	if len(TRs) == 1:
 		create_report(TRs[0], dest_folder_path)
@@ -167,5 +173,11 @@ def _convert_teach_result_to_txt(TR: TeachResult, path: str):
 	with open(path, "w") as fp:
 		fp.write(str(TR))
 
+def _group_by_time_limit(TRs):
+	groups = dict()
+	for TR in TRs:
+		groups.setdefault(TR.main_infos.time_limit, []).append(TR)
+	return list(groups.values())
+
 def _is_valid_configuration_file(file_name):
 	return file_name.endswith("conf")
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+This module implements the ClusterTeacher, a teacher that sends
+diverse examples: the dataset is partitioned in clusters (mini-batch
+k-means, see Utils.Clustering, cached on disk per dataset) and the
+examples are taken from all the clusters
+
+The first sample is taken round-robin across the clusters (plus one
+example of each class missing in it). In each iteration, the learner
+classifies a sample of the unsent examples of each cluster and the
+batch (that doubles in size) is split among the clusters in
+proportion to their number of unsent examples times their observed
+error, so the clusters where the learner is wrong get more examples.
+Inside each cluster, the misclassified examples are sent first
+"""
+
+import numpy as np
+
+from ..GenericTeacher import Teacher
+from ..Utils.Clustering import get_clusters
+from ..Utils.GroupPool import GroupPool
+from ..Utils.GroupPool import allocate
+
+class ClusterTeacher(Teacher):
+	"""
+	Parameters
+	-----------
+	seed: int -- seed of the order of the examples inside each cluster
+	(the clustering is the same for all the seeds)
+	frac_start: float -- size of the first sample (fraction of the dataset)
+	qtd_clusters: int -- number of clusters (None: one for each
+	_ROWS_PER_CLUSTER rows, from 2 to _MAX_CLUSTERS)
+	cache_folder: str -- folder where the clusterings are cached (None:
+	computed in every run)
+	"""
+	name = "ClusterTeacher"
+	_SEED = 0
+	_FRAC_START = 0.01
+	_ROWS_PER_CLUSTER = 1000
+	_MAX_CLUSTERS = 256
+	_MIN_TESTS_PER_CLUSTER = 10 # to estimate the error of each cluster
+
+	def __init__(self, seed: int = _SEED,
+		frac_start: float = _FRAC_START,
+		qtd_clusters: int = None,
+		cache_folder: str = None):
+		self.seed = seed
+		self.frac_start = frac_start
+		self.qtd_clusters = qtd_clusters
+		self.cache_folder = cache_folder
+
+		assert 0.0 <= frac_start <= 1.0, "frac_start must be in [0, 1]"
+		assert qtd_clusters is None or qtd_clusters >= 1, \
+			"qtd_clusters must be at least 1"
+
+	def start(self, X, y, time_left: float):
+		self._start(X, y, time_left)
+		self.num_iters = 0
+		self.m = y.size
+		self.S_current_size = 0
+		self.batch_size = 1
+		self.last_accuracy = 0.0
+
+		k = self.qtd_clusters
+		if k is None:
+			k = min(self._MAX_CLUSTERS, max(2, self.m // self._ROWS_PER_CLUSTER))
+		clusters = get_clusters(X, k, self.cache_folder)
+		self.pool = GroupPool(clusters, k, self.seed)
+		self.qtd_tested = np.zeros(k, dtype=np.int64)
+
+	def _keep_going(self):
+		return self.S_current_size < self.m
+
+	def get_first_examples(self, time_left: float):
+		n = max(1, int(np.ceil(self.frac_start * self.m)))
+		# round-robin: the same number of examples of each cluster
+		remaining = self.pool.get_remaining()
+		quotas = allocate(n, remaining, np.ones(remaining.size))
+		new_ids = self.pool.send_next(quotas)
+
+		# at least one example of each class
+		missing = np.setdiff1d(self.label_index.classes, self.y[new_ids])
+		extra = [self.label_index.get_ids(c)[0] for c in missing]
+		for i in extra:
+			self.pool.send(i)
+		new_ids = np.concatenate((new_ids, np.array(extra, dtype=new_ids.dtype)))
+
+		self.batch_size = len(new_ids)
+		return self._send_new_ids(new_ids)
+
+	def get_new_test_ids(self, test_ids,
+		test_labels, time_left: float) -> np.ndarray:
+		if not self._keep_going() or len(test_ids) > 0:
+			return np.array([])
+
+		# the first unsent examples of each cluster
+		k = self.pool.get_qtd_groups()
+		per_cluster = max(self._MIN_TESTS_PER_CLUSTER,
+			int(np.ceil(self.batch_size / k)))
+		self.qtd_tested = np.minimum(per_cluster, self.pool.get_remaining())
+		return self.pool.get_next(self.qtd_tested)
+
+	def get_new_examples(self, test_ids, test_labels, time_left: float):
+		if not self._keep_going() or len(test_ids) == 0:
+			return np.array([])
+
+		wrong = self.y[test_ids] != test_labels
+		self.last_accuracy = 1.0 - np.count_nonzero(wrong)/len(test_ids)
+
+		# the misclassified examples first, inside each tested prefix
+		k = self.pool.get_qtd_groups()
+		cluster = np.repeat(np.arange(k), self.qtd_tested)
+		qtd_wrong = np.bincount(cluster, weights=wrong, minlength=k)
+		order = np.lexsort((~wrong, cluster))
+		self.pool.set_next(test_ids[order], self.qtd_tested)
+
+		# Laplace smoothing: clusters with few tests are not ignored
+		error = (qtd_wrong + 1.0) / (self.qtd_tested + 2.0)
+		remaining = self.pool.get_remaining()
+		quotas = allocate(self.batch_size, remaining, remaining * error)
+		new_ids = self.pool.send_next(quotas)
+
+		self.batch_size *= 2
+		return self._send_new_ids(new_ids)
+
+	def _send_new_ids(self, new_ids):
+		self.num_iters += 1
+		self.S_current_size += len(new_ids)
+		return new_ids
+
+	def get_params(self) -> dict:
+		return {
+			"seed": self.seed,
+			"frac_start": self.frac_start,
+			"qtd_clusters": self.qtd_clusters,
+			"cache_folder": self.cache_folder,
+			}
+
+	def _get_accuracy(self, h=None):
+		return self.last_accuracy
@@ -1,24 +1,40 @@
 import numpy as np
 from ..GenericTeacher import Teacher
 from ..Utils.Sampler import get_first_examples
+from ..Utils.IdPool import IdPool
+from ..Utils.FitCostModel import AdaptiveBatchMixin
+from ..Definitions import create_ids
+from ..Definitions import wrapp_ids
 from sklearn import preprocessing
 import warnings
 
-class DoubleTeacher(Teacher):
+class DoubleTeacher(AdaptiveBatchMixin, Teacher):
+	"""
+	Sends batches (of random examples) that double in size
+
+	If adaptive_batch is True, the batch size is adapted to the fit
+	times observed so far (see Utils.FitCostModel): the last fit is
+	expected to end fit_time_margin (a fraction) before the time is over
+	"""
 	name = "DoubleTeacher"
 	_SEED = 0
 	_FRAC_START = 0.01
 	_STRATEGY_DOUBLE_INCREMENT = 0
 	_STRATEGY_DOUBLE_SIZE = 1
+	_FIT_TIME_MARGIN = 0.3
 
 	def __init__(self, seed: int = _SEED,
 		frac_start: float = _FRAC_START,
 		strategy: int = _STRATEGY_DOUBLE_INCREMENT,
-		increment_start: int = 1):
+		increment_start: int = 1,
+		adaptive_batch: bool = False,
+		fit_time_margin: float = _FIT_TIME_MARGIN):
 		self.seed = seed
 		self.frac_start = frac_start
 		self.strategy = strategy
 		self.increment_start = increment_start
+		self.adaptive_batch = adaptive_batch
+		self.fit_time_margin = fit_time_margin
 
 	def start(self, X, y, time_left: float):
 		self._start(X, y, time_left)
@@ -26,27 +42,22 @@ class DoubleTeacher(Teacher):
 		self.m = y.size
 		self.S_current_size = 0
 		self.batch_size = 1
+		self._start_fit_cost(self.fit_time_margin)
 		
-		self.shuffled_ids = self._get_shuffled_ids()
+		self.id_pool = IdPool(self._get_shuffled_ids())
 
-		assert len(self.shuffled_ids) == len(self.ids)
+		assert self.id_pool.m == len(self.ids)
 		
 	def _keep_going(self):
 		return self.S_current_size < self.m
 
 	def get_first_examples(self, time_left: float):
-		classes = np.unique(self.y) # isso devia sair. devia ser computado for get_first_examples
+		classes = self.label_index.classes
 		f_shuffle = np.random.RandomState(self.seed).shuffle
 		new_ids = get_first_examples(self.frac_start, self.m,
-			classes, self.y, f_shuffle)
-		new_ids = np.array(new_ids)
-		
-		# update shuffled_ids. Aqui usamos ponteiros de ponteiros.
-		# debugue as próximas duas linhas de cabeça vazia
-		_new_ids = set(new_ids)
-		self.shuffled_ids = np.append(new_ids,
-							          [i for i in self.shuffled_ids if i not in _new_ids])
-		#self.unshuffled_ids = self._get_reverse_map(self.shuffled_ids)
+			classes, self.y, f_shuffle, self.label_index)
+		new_ids = wrapp_ids(new_ids, self.m)
+		self.id_pool.send(new_ids)
 
 		# update batch size, from 1 to len(new_ids), based on strategy
 		if self.strategy == self._STRATEGY_DOUBLE_SIZE:
@@ -56,20 +67,26 @@ class DoubleTeacher(Teacher):
 		else:
 			raise ValueError("Estrategia desconhecida: " + str(self.strategy))
 
+		self._fit_started(len(new_ids), time_left)
 		return self._send_new_ids(new_ids)
 
 	def get_new_examples(self, test_ids, test_labels, time_left: float):
 		if not self._keep_going():
 			return np.array([])
 
-		_start = self.S_current_size
-		_end = min(_start + self.batch_size, self.m)
-		new_ids = self.shuffled_ids[_start:_end]
+		if self.adaptive_batch:
+			self.batch_size = self._get_adaptive_batch_size(
+				self.S_current_size, self.batch_size, time_left,
+				self.m - self.S_current_size)
+		new_ids = self.id_pool.send_next(self.batch_size)
 		self.batch_size *= 2
+		self._fit_started(self.S_current_size + len(new_ids), time_left)
 		return self._send_new_ids(new_ids)
 
 	def get_new_test_ids(self, test_ids,
 		test_labels, time_left: float) -> np.ndarray:
+		# the first call of an iteration, right after the fit
+		self._fit_ended(time_left)
 		return np.array([])
 
 	def get_log_header(self):
@@ -86,7 +103,7 @@ class DoubleTeacher(Teacher):
 		return new_ids
 
 	def _get_shuffled_ids(self):
-		ids = np.arange(self.m, dtype=int)
+		ids = create_ids(self.m)
 		f_shuffle = np.random.RandomState(self.seed).shuffle
 		f_shuffle(ids)
 		return ids
@@ -96,4 +113,6 @@ class DoubleTeacher(Teacher):
 			"seed": self.seed,
 			"frac_start": self.frac_start,
 			"strategy": self.strategy,
+			"adaptive_batch": self.adaptive_batch,
+			"fit_time_margin": self.fit_time_margin,
 			}
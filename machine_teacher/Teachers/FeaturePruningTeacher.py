@@ -0,0 +1,124 @@
+"""
+This module implements the FeaturePruningTeacher, a teacher that
+chooses the examples with another teacher and, along the teaching,
+removes the columns (features) that are not important for the learner,
+so the next fits (and predictions) run on fewer columns
+
+After each iteration, once the learner was trained with at least
+min_train_size examples, the active columns are sorted by the
+importance reported by the learner (see
+Learner.get_feature_importances) and only the most important ones,
+that sum importance_coverage of the total importance, are kept
+(at least min_columns). A removed column is never used again
+"""
+
+import numpy as np
+from copy import deepcopy
+
+from ..GenericTeacher import Teacher
+from ..Definitions import get_qtd_columns
+
+class FeaturePruningTeacher(Teacher):
+	"""
+	Parameters
+	-----------
+	teacher -- the teacher that chooses the examples, a Teacher object
+	or a (teacher_name, kwargs) pair (see Utils.TeacherLearnerLoader)
+	importance_coverage: float -- fraction of the total importance
+	kept in each pruning
+	min_columns: int -- minimum number of columns
+	min_train_size: int -- the importances of learners trained with
+	fewer examples are not used (they are not reliable)
+	"""
+	name = "FeaturePruningTeacher"
+	uses_column_mask = True
+	_IMPORTANCE_COVERAGE = 0.99
+	_MIN_COLUMNS = 1
+	_MIN_TRAIN_SIZE = 1000
+
+	def __init__(self, teacher,
+		importance_coverage: float = _IMPORTANCE_COVERAGE,
+		min_columns: int = _MIN_COLUMNS,
+		min_train_size: int = _MIN_TRAIN_SIZE):
+		# names are loaded here: the loader imports this module
+		from ..Utils.TeacherLearnerLoader import get_teacher
+		self.teacher = (teacher if isinstance(teacher, Teacher)
+			else get_teacher(*teacher))
+		self.importance_coverage = importance_coverage
+		self.min_columns = min_columns
+		self.min_train_size = min_train_size
+
+		assert 0.0 < importance_coverage <= 1.0, \
+			"importance_coverage must be in (0, 1]"
+		assert min_columns >= 1, "min_columns must be at least 1"
+
+	def start(self, X, y, time_left: float):
+		self._start(X, y, time_left)
+		self.base_teacher = deepcopy(self.teacher)
+		self.base_teacher.start(X, y, time_left)
+		self.uses_scores = self.base_teacher.uses_scores
+		self.uses_sample_weight = self.base_teacher.uses_sample_weight
+		self.mask = np.ones(get_qtd_columns(X), dtype=bool)
+		self.S_current_size = 0
+		self.fitted_size = 0 # training set size of the current model
+
+	def get_first_examples(self, time_left: float):
+		new_ids = self.base_teacher.get_first_examples(time_left)
+		self.S_current_size += len(new_ids)
+		return new_ids
+
+	def get_new_test_ids(self, test_ids,
+		test_labels, time_left: float) -> np.ndarray:
+		return self.base_teacher.get_new_test_ids(test_ids, test_labels,
+			time_left)
+
+	def get_new_examples(self, test_ids, test_labels, time_left: float,
+		test_scores = None):
+		if self.uses_scores:
+			new_ids = self.base_teacher.get_new_examples(test_ids,
+				test_labels, time_left, test_scores=test_scores)
+		else:
+			new_ids = self.base_teacher.get_new_examples(test_ids,
+				test_labels, time_left)
+		self.fitted_size = self.S_current_size
+		self.S_current_size += len(new_ids)
+		return new_ids
+
+	def get_column_mask(self, feature_importances, time_left: float):
+		if feature_importances is None or self.fitted_size < self.min_train_size:
+			return None
+
+		active = np.flatnonzero(self.mask)
+		importances = np.asarray(feature_importances, dtype=np.float64)[active]
+		total = importances.sum()
+		if total <= 0:
+			return None
+
+		# the most important columns, up to the coverage
+		order = np.argsort(-importances, kind="stable")
+		cum = np.cumsum(importances[order])
+		qtd_kept = np.searchsorted(cum, self.importance_coverage * total) + 1
+		qtd_kept = min(max(qtd_kept, self.min_columns), len(active))
+		if qtd_kept == len(active):
+			return None
+
+		self.mask = np.zeros(self.mask.size, dtype=bool)
+		self.mask[active[order[:qtd_kept]]] = True
+		return self.mask
+
+	def get_sample_weight(self, train_ids):
+		return self.base_teacher.get_sample_weight(train_ids)
+
+	def get_qtd_active_columns(self) -> int:
+		return np.count_nonzero(self.mask)
+
+	def get_params(self) -> dict:
+		return {
+			"teacher": (self.teacher.name, self.teacher.get_params()),
+			"importance_coverage": self.importance_coverage,
+			"min_columns": self.min_columns,
+			"min_train_size": self.min_train_size,
+			}
+
+	def _get_accuracy(self, h=None):
+		return self.base_teacher._get_accuracy(h)
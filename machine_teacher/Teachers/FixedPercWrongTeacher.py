@@ -2,11 +2,28 @@
 import numpy as np
 from ..GenericTeacher import Teacher
 from ..Utils.Sampler import get_first_examples
+from ..Utils.IdPool import IdPool
+from ..Utils.FitCostModel import AdaptiveBatchMixin
+from ..Definitions import create_ids
+from ..Definitions import wrapp_ids
 from sklearn import preprocessing
 import warnings
 
-class FixedPercWrongTeacher(Teacher):
-	"""docstring for FixedPercWrongTeacher"""
+class FixedPercWrongTeacher(AdaptiveBatchMixin, Teacher):
+	"""
+	Sends batches that double in size, with the wrong examples of a
+	tested sample and, to complete the batch, right ones
+
+	If adaptive_batch is True, the batch size is adapted to the fit
+	times observed so far (see Utils.FitCostModel): the last fit is
+	expected to end fit_time_margin (a fraction) before the time is over
+
+	If error_ci_width is given, the error is estimated by a sequential
+	test: the unsent examples are classified in chunks (that double in
+	size, up to the size of the training set) until the 95% confidence
+	interval of the error, post-stratified by class, is narrower than
+	error_ci_width times the error (a relative width)
+	"""
 	name = "FixedPercWrongTeacher"
 	_SEED = 0
 	_FRAC_START = 0.01
@@ -18,18 +35,31 @@ class FixedPercWrongTeacher(Teacher):
 	_STATE_SEND_NEW_IDS = 0
 	_STATE_CHOOSE_BATCH_SIZE_NEW_IDS = 1
 	_STATE_SEND_EMPTY_NEW_IDS = 2
+	_STATE_SEQUENTIAL_TEST = 3
 	_SAMPLE_SIZE = 300 #sample size sent to the student to analyze the accuracy
+	_FIT_TIME_MARGIN = 0.3
+	_FIRST_TEST_CHUNK = 100 # size of the first chunk of the sequential test
+	_Z = 1.96 # 95% confidence
 
 	def __init__(self, seed: int = _SEED,
 		frac_start: float = _FRAC_START,
 		frac_wrong_increment = _FRAC_WRONG_INCREMENT,
 		sample_size = _SAMPLE_SIZE,
-		strategy: int = _STRATEGY_DOUBLE_INCREMENT):
+		strategy: int = _STRATEGY_DOUBLE_INCREMENT,
+		adaptive_batch: bool = False,
+		fit_time_margin: float = _FIT_TIME_MARGIN,
+		error_ci_width: float = None):
 		self.seed = seed
 		self.frac_start = frac_start
 		self.strategy = strategy
 		self.frac_wrong_increment = frac_wrong_increment
 		self.sample_size = sample_size
+		self.adaptive_batch = adaptive_batch
+		self.fit_time_margin = fit_time_margin
+		self.error_ci_width = error_ci_width
+
+		assert error_ci_width is None or error_ci_width > 0, \
+			"error_ci_width must be positive"
 		
 
 	def start(self, X, y, time_left: float):
@@ -41,13 +71,16 @@ class FixedPercWrongTeacher(Teacher):
 		self.state_new_ids = self._STATE_SEND_NEW_IDS
 		self._STATE_DONE = False
 		self.f_shuffle = np.random.RandomState(self.seed).shuffle
-		self.shuffled_ids = self._get_shuffled_ids()
+		self.id_pool = IdPool(self._get_shuffled_ids())
 		self.last_accuracy = 0.0
+		self._start_fit_cost(self.fit_time_margin)
+		# the number of unsent examples of each class (for the post-stratification)
+		self.unsent_counts = self.label_index.counts.copy()
 
-		assert len(self.shuffled_ids) == len(self.ids)
+		assert self.id_pool.m == len(self.ids)
 
 	def _get_shuffled_ids(self):
-		ids = np.arange(self.m, dtype=int)
+		ids = create_ids(self.m)
 		# f_shuffle = np.random.RandomState(self.seed).shuffle
 		self.f_shuffle(ids)
 		return ids
@@ -56,17 +89,13 @@ class FixedPercWrongTeacher(Teacher):
 		return self.S_current_size < self.m
 
 	def get_first_examples(self, time_left: float):
-		classes = np.unique(self.y) # isso devia sair. devia ser computado for get_first_examples
+		classes = self.label_index.classes
 		f_shuffle = np.random.RandomState(self.seed).shuffle
-		new_ids = get_first_examples(self.frac_start, self.m, classes, self.y, f_shuffle)
-		new_ids = np.array(new_ids)
-		
-		# update shuffled_ids. Aqui usamos ponteiros de ponteiros.
-		# debugue as próximas duas linhas de cabeça vazia
-		_new_ids = set(new_ids)
-		self.shuffled_ids = np.append(new_ids,
-							          [i for i in self.shuffled_ids if i not in _new_ids])
-		
+		new_ids = get_first_examples(self.frac_start, self.m, classes, self.y, f_shuffle,
+			self.label_index)
+		new_ids = wrapp_ids(new_ids, self.m)
+		self.id_pool.send(new_ids)
+
 		# update batch size, from 1 to len(new_ids), based on strategy
 		if self.strategy == self._STRATEGY_DOUBLE_SIZE:
 			self.batch_size = len(new_ids)			
@@ -76,30 +105,35 @@ class FixedPercWrongTeacher(Teacher):
 		else:
 			raise ValueError("Estrategia desconhecida: " + str(self.strategy))
 
+		self.unsent_counts -= np.bincount(self.y[new_ids],
+			minlength=self.unsent_counts.size)
+		self._fit_started(len(new_ids), time_left)
 		return self._send_new_ids(new_ids)
 
 	def get_new_examples(self, test_ids, test_labels, time_left: float):
 		if not self._keep_going() or self._STATE_DONE:
 			return np.array([])
 
-		new_ids = self.shuffled_ids[self.S_current_size:]
 		correct_test_labels = self.y[test_ids]
 		wrong_ids = test_ids[test_labels != correct_test_labels]
 		correct_ids = test_ids[test_labels == correct_test_labels]
 		new_ids = np.append(wrong_ids, correct_ids[:self.batch_size-wrong_ids.size])
 
-		unselected_ids = np.copy(correct_ids[self.batch_size-wrong_ids.size:]) 		
-		remaining_ids = np.copy(self.shuffled_ids[self.S_current_size+test_ids.size:])
-		self.shuffled_ids[self.S_current_size:] = np.concatenate((new_ids, remaining_ids, unselected_ids))
+		# the tested ids that were not selected go to the end of the pool
+		unselected_ids = correct_ids[self.batch_size-wrong_ids.size:]
+		self.id_pool.send_and_park(new_ids, unselected_ids)
 
 
-		error = (len(wrong_ids)/len(test_ids))
+		error = self._estimate_error(test_ids, test_labels)
 		self.last_accuracy = 1.0 - error
+		self.unsent_counts -= np.bincount(self.y[new_ids],
+			minlength=self.unsent_counts.size)
 		
 
 		self.batch_size *= 2
 		self.state_new_ids = self._STATE_SEND_NEW_IDS
 
+		self._fit_started(self.S_current_size + len(new_ids), time_left)
 		return self._send_new_ids(new_ids)
 
 
@@ -109,18 +143,32 @@ class FixedPercWrongTeacher(Teacher):
 			return np.array([])
 
 		if self.state_new_ids == self._STATE_SEND_NEW_IDS:
+			# the first call of an iteration, right after the fit
+			self._fit_ended(time_left)
+			if self.adaptive_batch:
+				self.batch_size = self._get_adaptive_batch_size(
+					self.S_current_size, self.batch_size, time_left,
+					self.m - self.S_current_size)
 			self.sample_size = self.S_current_size
-			_start = self.S_current_size 
-			_end = min(_start + self.sample_size, self.m)
-			new_ids = self.shuffled_ids[_start:_end]
 			self.state_new_ids = self._STATE_CHOOSE_BATCH_SIZE_NEW_IDS
+			if self.error_ci_width is not None:
+				self.sample_size = min(self.sample_size, self._FIRST_TEST_CHUNK)
+				self.state_new_ids = self._STATE_SEQUENTIAL_TEST
+			new_ids = self.id_pool.get_unsent(0, self.sample_size)
 			assert type(new_ids) == type(np.array([]))
 			return new_ids
-		
+
+		if self.state_new_ids == self._STATE_SEQUENTIAL_TEST:
+			new_ids = self._get_next_test_chunk(test_ids, test_labels)
+			if len(new_ids) > 0:
+				return new_ids
+			self.sample_size = len(test_ids)
+			self.state_new_ids = self._STATE_CHOOSE_BATCH_SIZE_NEW_IDS
+
 		if self.state_new_ids == self._STATE_CHOOSE_BATCH_SIZE_NEW_IDS:
 			correct_test_labels = self.y[test_ids]
 			wrong_labels = test_ids[test_labels != correct_test_labels]
-			error = (len(wrong_labels)/len(test_ids))
+			error = self._estimate_error(test_ids, test_labels)
 			
 			assert (error > 0 or len(wrong_labels) == 0)
 			assert (error < 1 or len(wrong_labels) == len(test_ids))
@@ -136,19 +184,50 @@ class FixedPercWrongTeacher(Teacher):
 			increment = int((self.frac_wrong_increment*self.batch_size)/error)
 			increment -= int(self.frac_wrong_increment*self.batch_size)
 			increment = max(increment, 0)
-			_start = (self.S_current_size + 
-					  self.sample_size)
-			_end = (self.S_current_size +
-					self.batch_size +
-					increment)
-
-			_end = min(_end , self.m)
-			new_ids = self.shuffled_ids[_start:_end]
+			_start = self.sample_size
+			_end = self.batch_size + increment
+			new_ids = self.id_pool.get_unsent(_start, _end)
 			self.state_new_ids = self._STATE_SEND_EMPTY_NEW_IDS
 			return new_ids
 
 		return np.array([])
 
+	def _get_next_test_chunk(self, test_ids, test_labels):
+		"""Returns the next chunk of the sequential test (empty if the
+		confidence interval is narrow enough or the test is over)"""
+		qtd_tested = len(test_ids)
+		end = min(2*qtd_tested, self.S_current_size, self.id_pool.qtd_unsent)
+		if end <= qtd_tested:
+			return np.array([])
+		(error, half_width) = self._get_stratified_error(test_ids, test_labels)
+		if 2*half_width <= self.error_ci_width * error:
+			return np.array([])
+		return self.id_pool.get_unsent(qtd_tested, end)
+
+	def _estimate_error(self, test_ids, test_labels) -> float:
+		if self.error_ci_width is None:
+			return np.count_nonzero(self.y[test_ids] != test_labels)/len(test_ids)
+		(error, __) = self._get_stratified_error(test_ids, test_labels)
+		return error
+
+	def _get_stratified_error(self, test_ids, test_labels):
+		"""Returns the error on the unsent examples, post-stratified by
+		class (weighted by the unsent examples of each class), and the
+		half width of its confidence interval. The variance uses the
+		Laplace smoothed errors, so the interval is not empty without errors"""
+		y = self.y[test_ids]
+		qtd_columns = self.unsent_counts.size
+		tested = np.bincount(y, minlength=qtd_columns)
+		wrong = np.bincount(y, weights=(y != test_labels), minlength=qtd_columns)
+		weights = np.where(tested > 0, self.unsent_counts, 0).astype(np.float64)
+		weights /= weights.sum()
+
+		n = np.maximum(tested, 1)
+		error = np.dot(weights, wrong / n)
+		smoothed = (wrong + 1.0) / (n + 2.0)
+		variance = np.dot(weights**2, smoothed * (1 - smoothed) / n)
+		return (error, self._Z * np.sqrt(variance))
+
 	def get_log_header(self):
 		return ["iter_number", "training_set_size", "accuracy"]
 
@@ -169,6 +248,9 @@ class FixedPercWrongTeacher(Teacher):
 			"frac_start": self.frac_start,
 			"strategy": self.strategy,
 			"frac_wrong_increment": self.frac_wrong_increment,
+			"adaptive_batch": self.adaptive_batch,
+			"fit_time_margin": self.fit_time_margin,
+			"error_ci_width": self.error_ci_width,
 			}
 
 	def _get_accuracy(self, h=None):		
@@ -0,0 +1,177 @@
+"""
+This module implements the MarginTeacher, a teacher driven by the
+scores (probabilities or decision values) of the learner
+
+In each iteration, the learner classifies a pool of candidates (the
+next unsent ids, in a random order) and the teacher sends:
+(1) a fraction (frac_high_loss) of the batch with the examples with
+the highest loss: the misclassified examples with the lowest margin
+of the correct class (score of the correct class minus the best score
+of the other classes),
+(2) a fraction (frac_random) of the rest of the batch in the random
+order, and
+(3) the examples with the lowest margin between the two best classes
+(the most uncertain ones)
+The candidates that are not sent go back to the end of the pool
+
+If the learner does not support scores, the teacher sends the
+misclassified candidates first, and the others in the random order
+"""
+
+import numpy as np
+
+from ..GenericTeacher import Teacher
+from ..Utils.Sampler import get_first_examples
+from ..Utils.IdPool import IdPool
+from ..Definitions import create_ids
+from ..Definitions import wrapp_ids
+
+class MarginTeacher(Teacher):
+	"""
+	Parameters
+	-----------
+	seed: int -- seed of the random order of the examples
+	frac_start: float -- size of the first sample (fraction of the dataset)
+	candidates_factor: float -- size of the pool of candidates, in
+	number of batches (the batch size doubles in each iteration)
+	frac_high_loss: float -- fraction of the batch taken from the
+	examples with the highest loss
+	frac_random: float -- fraction of the rest of the batch taken at
+	random (the others are the most uncertain examples)
+	"""
+	name = "MarginTeacher"
+	uses_scores = True
+	_SEED = 0
+	_FRAC_START = 0.01
+	_CANDIDATES_FACTOR = 4.0
+	_FRAC_HIGH_LOSS = 0.0 # high loss examples are often label noise
+	_FRAC_RANDOM = 0.0
+
+	def __init__(self, seed: int = _SEED,
+		frac_start: float = _FRAC_START,
+		candidates_factor: float = _CANDIDATES_FACTOR,
+		frac_high_loss: float = _FRAC_HIGH_LOSS,
+		frac_random: float = _FRAC_RANDOM):
+		self.seed = seed
+		self.frac_start = frac_start
+		self.candidates_factor = candidates_factor
+		self.frac_high_loss = frac_high_loss
+		self.frac_random = frac_random
+
+		assert 0.0 <= frac_start <= 1.0, "frac_start must be in [0, 1]"
+		assert candidates_factor >= 1.0, "candidates_factor must be at least 1"
+		assert 0.0 <= frac_high_loss <= 1.0, "frac_high_loss must be in [0, 1]"
+		assert 0.0 <= frac_random <= 1.0, "frac_random must be in [0, 1]"
+
+	def start(self, X, y, time_left: float):
+		self._start(X, y, time_left)
+		self.num_iters = 0
+		self.m = y.size
+		self.S_current_size = 0
+		self.batch_size = 1
+		self.last_accuracy = 0.0
+
+		ids = create_ids(self.m)
+		np.random.RandomState(self.seed).shuffle(ids)
+		self.id_pool = IdPool(ids)
+
+	def _keep_going(self):
+		return self.S_current_size < self.m
+
+	def get_first_examples(self, time_left: float):
+		f_shuffle = np.random.RandomState(self.seed).shuffle
+		new_ids = get_first_examples(self.frac_start, self.m,
+			self.label_index.classes, self.y, f_shuffle, self.label_index)
+		new_ids = wrapp_ids(new_ids, self.m)
+
+		self.id_pool.send(new_ids)
+		self.batch_size = len(new_ids)
+		return self._send_new_ids(new_ids)
+
+	def get_new_test_ids(self, test_ids,
+		test_labels, time_left: float) -> np.ndarray:
+		if not self._keep_going() or len(test_ids) > 0:
+			return np.array([])
+
+		qtd_candidates = int(np.ceil(self.candidates_factor * self.batch_size))
+		return self.id_pool.get_unsent(0, qtd_candidates)
+
+	def get_new_examples(self, test_ids, test_labels, time_left: float,
+		test_scores = None):
+		if not self._keep_going() or len(test_ids) == 0:
+			return np.array([])
+
+		wrong = self.y[test_ids] != test_labels
+		self.last_accuracy = 1.0 - np.count_nonzero(wrong)/len(test_ids)
+
+		k = min(self.batch_size, len(test_ids))
+		if test_scores is None:
+			order = np.argsort(~wrong, kind="stable")
+		else:
+			order = self._get_order(test_ids, wrong, test_scores, k)
+		selected = order[:k]
+		not_selected = np.ones(len(test_ids), dtype=bool)
+		not_selected[selected] = False
+
+		new_ids = test_ids[selected]
+		self.id_pool.send_and_park(new_ids, test_ids[not_selected])
+		self.batch_size *= 2
+		return self._send_new_ids(new_ids)
+
+	def _get_order(self, test_ids, wrong, scores, k):
+		"""Returns the positions (in test_ids) of the examples with
+		the highest loss, followed by the random ones and by the
+		most uncertain ones"""
+		scores = self._get_scores_by_class(scores)
+		rows = np.arange(len(test_ids))
+		y = self.y[test_ids]
+
+		# margin of the correct class (negative if wrong)
+		correct_scores = scores[rows, y]
+		scores_others = scores.copy()
+		scores_others[rows, y] = -np.inf
+		true_margin = correct_scores - np.max(scores_others, axis=1)
+
+		# margin between the two best classes
+		top2 = -np.partition(-scores, 1, axis=1)[:, :2]
+		uncertainty_margin = top2[:, 0] - top2[:, 1]
+
+		qtd_high_loss = min(int(round(self.frac_high_loss * k)),
+			np.count_nonzero(wrong))
+		high_loss = np.argsort(np.where(wrong, true_margin, np.inf),
+			kind="stable")[:qtd_high_loss]
+
+		others = np.ones(len(test_ids), dtype=bool)
+		others[high_loss] = False
+		others = rows[others]
+		# part of the rest of the batch in the random order of the pool
+		qtd_random = int(round(self.frac_random * (k - qtd_high_loss)))
+		(random_ids, others) = (others[:qtd_random], others[qtd_random:])
+		uncertain = others[np.argsort(uncertainty_margin[others], kind="stable")]
+		return np.concatenate((high_loss, random_ids, uncertain))
+
+	def _get_scores_by_class(self, scores):
+		# one column for each class of the dataset (the model may not
+		# have seen the last classes)
+		qtd_columns = self.label_index.counts.size
+		if scores.shape[1] < qtd_columns:
+			scores = np.pad(scores, ((0, 0), (0, qtd_columns - scores.shape[1])),
+				constant_values=-np.inf)
+		return scores
+
+	def _send_new_ids(self, new_ids):
+		self.num_iters += 1
+		self.S_current_size += len(new_ids)
+		return new_ids
+
+	def get_params(self) -> dict:
+		return {
+			"seed": self.seed,
+			"frac_start": self.frac_start,
+			"candidates_factor": self.candidates_factor,
+			"frac_high_loss": self.frac_high_loss,
+			"frac_random": self.frac_random,
+			}
+
+	def _get_accuracy(self, h=None):
+		return self.last_accuracy
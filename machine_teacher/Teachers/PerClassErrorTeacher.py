@@ -0,0 +1,121 @@
+"""
+This module implements the PerClassErrorTeacher, a teacher that
+splits each batch among the classes, in proportion to the error of
+the learner on each class
+
+The first sample has the same number of examples of each class. In
+each iteration, the learner classifies a sample of the unsent
+examples of each class, the error of each class is estimated from it
+(with bincounts over the tested examples) and the batch (that doubles
+in size) is split among the classes in proportion to their estimated
+error mass: the number of unsent examples times the error, i.e., the
+expected number of misclassified examples of the class. With
+balanced = True, the split is proportional to the error rate alone,
+as each class has the same weight in the balanced accuracy. Inside
+each class, the misclassified examples are sent first
+"""
+
+import numpy as np
+
+from ..GenericTeacher import Teacher
+from ..Utils.GroupPool import GroupPool
+from ..Utils.GroupPool import allocate
+
+class PerClassErrorTeacher(Teacher):
+	"""
+	Parameters
+	-----------
+	seed: int -- seed of the order of the examples
+	frac_start: float -- size of the first sample (fraction of the dataset)
+	balanced: bool -- whether the batches are split by the error rate
+	of the classes (for the balanced accuracy) instead of their error mass
+	"""
+	name = "PerClassErrorTeacher"
+	_SEED = 0
+	_FRAC_START = 0.01
+	_MIN_TESTS_PER_CLASS = 10 # to estimate the error of each class
+
+	def __init__(self, seed: int = _SEED,
+		frac_start: float = _FRAC_START,
+		balanced: bool = False):
+		self.seed = seed
+		self.frac_start = frac_start
+		self.balanced = balanced
+
+		assert 0.0 <= frac_start <= 1.0, "frac_start must be in [0, 1]"
+
+	def start(self, X, y, time_left: float):
+		self._start(X, y, time_left)
+		self.num_iters = 0
+		self.m = y.size
+		self.S_current_size = 0
+		self.batch_size = 1
+		self.last_accuracy = 0.0
+
+		qtd_labels = self.label_index.counts.size
+		self.pool = GroupPool(y, qtd_labels, self.seed)
+		self.qtd_tested = np.zeros(qtd_labels, dtype=np.int64)
+
+	def _keep_going(self):
+		return self.S_current_size < self.m
+
+	def get_first_examples(self, time_left: float):
+		# at least one example of each class
+		n = max(self.label_index.get_qtd_classes(),
+			int(np.ceil(self.frac_start * self.m)))
+		remaining = self.pool.get_remaining()
+		quotas = allocate(n, remaining, np.ones(remaining.size))
+		new_ids = self.pool.send_next(quotas)
+
+		self.batch_size = len(new_ids)
+		return self._send_new_ids(new_ids)
+
+	def get_new_test_ids(self, test_ids,
+		test_labels, time_left: float) -> np.ndarray:
+		if not self._keep_going() or len(test_ids) > 0:
+			return np.array([])
+
+		# the first unsent examples of each class
+		per_class = max(self._MIN_TESTS_PER_CLASS,
+			int(np.ceil(self.batch_size / self.label_index.get_qtd_classes())))
+		self.qtd_tested = np.minimum(per_class, self.pool.get_remaining())
+		return self.pool.get_next(self.qtd_tested)
+
+	def get_new_examples(self, test_ids, test_labels, time_left: float):
+		if not self._keep_going() or len(test_ids) == 0:
+			return np.array([])
+
+		wrong = self.y[test_ids] != test_labels
+		self.last_accuracy = 1.0 - np.count_nonzero(wrong)/len(test_ids)
+
+		# the misclassified examples first, inside each tested prefix
+		qtd_labels = self.qtd_tested.size
+		labels = self.y[test_ids]
+		qtd_wrong = np.bincount(labels, weights=wrong, minlength=qtd_labels)
+		order = np.lexsort((~wrong, labels))
+		self.pool.set_next(test_ids[order], self.qtd_tested)
+
+		# Laplace smoothing: classes with few tests are not ignored
+		error = (qtd_wrong + 1.0) / (self.qtd_tested + 2.0)
+		remaining = self.pool.get_remaining()
+		weights = error if self.balanced else remaining * error
+		quotas = allocate(self.batch_size, remaining, weights)
+		new_ids = self.pool.send_next(quotas)
+
+		self.batch_size *= 2
+		return self._send_new_ids(new_ids)
+
+	def _send_new_ids(self, new_ids):
+		self.num_iters += 1
+		self.S_current_size += len(new_ids)
+		return new_ids
+
+	def get_params(self) -> dict:
+		return {
+			"seed": self.seed,
+			"frac_start": self.frac_start,
+			"balanced": self.balanced,
+			}
+
+	def _get_accuracy(self, h=None):
+		return self.last_accuracy
@@ -0,0 +1,253 @@
+"""
+This module implements the PortfolioTeacher, a teacher that runs
+several teachers (strategies) and keeps the best one for the dataset
+
+In get_first_examples, each teacher of the portfolio teaches its own
+copy of a learner (a complete interaction of the protocol, one
+iteration at a time). The iterations are given to the teachers by a
+bandit rule (UCB) on the accuracy gained per second, until a fraction
+(frac_explore) of the time is spent. The accuracy of each learner is
+measured on a common validation sample (without the examples the
+learner was trained with)
+
+The teacher with the most accurate learner wins: its training set
+is the first set of examples sent to the (real) learner, and the
+other calls are delegated to it, so the interaction goes on as if
+the winner had taught the real learner from the start (the training
+sets are joined, as in teach with join_sets = True)
+
+If a teacher of the portfolio chooses the columns (uses_column_mask),
+its learner is wrapped in a ColumnSubsetLearner, as in teach, and
+the portfolio chooses the columns of the real learner: the columns of
+the winner's learner, then the ones chosen by the winner
+"""
+
+import numpy as np
+from copy import deepcopy
+from timeit import default_timer
+
+from ..GenericTeacher import Teacher
+from ..GenericLearner import Learner
+from ..Learners.ColumnSubsetLearner import ColumnSubsetLearner
+from ..Utils.ProtocolSteps import run_tests
+from ..Utils.ProtocolSteps import update_columns
+from ..Utils.ProtocolSteps import fit
+from ..Utils.ProtocolSteps import predict
+from ..Utils.ProtocolSteps import get_sample_weight
+from ..Definitions import get_ids_dtype
+from ..Definitions import get_qtd_columns
+from ..Definitions import wrapp_ids
+
+class PortfolioTeacher(Teacher):
+	"""
+	Parameters
+	-----------
+	teachers -- the teachers of the portfolio, Teacher objects or
+	(teacher_name, kwargs) pairs (see Utils.TeacherLearnerLoader)
+	learner -- the learner copied for each teacher, a Learner object or
+	a (learner_name, kwargs) pair. It should be configured as the real one
+	seed: int -- seed of the validation sample
+	frac_explore: float -- fraction of the time spent running the portfolio
+	exploration: float -- weight of the exploration term of the UCB rule
+	validation_size: int -- size of the validation sample
+	"""
+	name = "PortfolioTeacher"
+	_SEED = 0
+	_FRAC_EXPLORE = 0.3
+	_EXPLORATION = 1.0
+	_VALIDATION_SIZE = 2000
+
+	def __init__(self, teachers, learner,
+		seed: int = _SEED,
+		frac_explore: float = _FRAC_EXPLORE,
+		exploration: float = _EXPLORATION,
+		validation_size: int = _VALIDATION_SIZE):
+		# names are loaded here: the loader imports this module
+		from ..Utils.TeacherLearnerLoader import get_teacher
+		from ..Utils.TeacherLearnerLoader import get_learner
+		self.teachers = [T if isinstance(T, Teacher) else get_teacher(*T)
+			for T in teachers]
+		self.learner = (learner if isinstance(learner, Learner)
+			else get_learner(*learner))
+		self.seed = seed
+		self.frac_explore = frac_explore
+		self.exploration = exploration
+		self.validation_size = validation_size
+		self.winner = None
+		# known before start: the protocol wraps the learner
+		self.uses_column_mask = any(T.uses_column_mask for T in self.teachers)
+
+		assert len(self.teachers) > 0, "the portfolio must have a teacher"
+		assert 0.0 <= frac_explore <= 1.0, "frac_explore must be in [0, 1]"
+		assert validation_size > 0, "validation_size must be positive"
+
+	def start(self, X, y, time_left: float):
+		self._start(X, y, time_left)
+		self.m = y.size
+		self.winner = None
+		self.winner_columns = None
+		self.uses_scores = False
+		self.uses_sample_weight = False
+
+		random_state = np.random.RandomState(self.seed)
+		self.validation_ids = random_state.choice(self.m,
+			min(self.validation_size, self.m), replace=False)
+
+		self.arms = [_Arm(deepcopy(T), deepcopy(self.learner))
+			for T in self.teachers]
+		for arm in self.arms:
+			arm.start(X, y, time_left)
+
+	def get_first_examples(self, time_left: float):
+		t0 = default_timer()
+		get_time_left = lambda: time_left - (default_timer() - t0)
+		budget = self.frac_explore * time_left
+
+		# each arm is tried once, then the UCB rule
+		active = list(self.arms)
+		while len(active) > 0:
+			spent = default_timer() - t0
+			untried = [arm for arm in active if arm.qtd_steps == 0]
+			if untried:
+				arm = untried[0]
+			else:
+				# the next iteration of an arm takes (at least) as much as the last one
+				active = [arm for arm in active
+					if spent + arm.last_step_time <= budget]
+				if len(active) == 0:
+					break
+				arm = self._choose_arm(active)
+
+			arm.step(self.X, self.y, get_time_left)
+			arm.evaluate(self.X, self.y, self.validation_ids)
+			if arm.done:
+				active.remove(arm)
+			if default_timer() - t0 >= budget:
+				break
+
+		self.winner = max(self.arms, key=lambda arm: arm.accuracy)
+		if isinstance(self.winner.learner, ColumnSubsetLearner):
+			self.winner_columns = self.winner.learner.next_columns
+		self.winner.learner = None
+		self.uses_scores = self.winner.teacher.uses_scores
+		self.uses_sample_weight = self.winner.teacher.uses_sample_weight
+		self.arms = None # the learners of the other arms are released
+		return self.winner.train_ids
+
+	def _choose_arm(self, arms):
+		# UCB: the last gain (the gains decrease), normalized, plus a bonus
+		# for the arms that ran few iterations
+		gains = np.array([arm.last_gain for arm in arms])
+		scale = np.max(np.abs(gains))
+		if scale > 0:
+			gains = gains / scale
+		qtd_steps = np.array([arm.qtd_steps for arm in arms])
+		bonus = np.sqrt(2 * np.log(qtd_steps.sum()) / qtd_steps)
+		return arms[int(np.argmax(gains + self.exploration * bonus))]
+
+	def get_new_test_ids(self, test_ids,
+		test_labels, time_left: float) -> np.ndarray:
+		return self.winner.teacher.get_new_test_ids(test_ids, test_labels,
+			time_left)
+
+	def get_new_examples(self, test_ids, test_labels, time_left: float,
+		test_scores = None):
+		if self.uses_scores:
+			return self.winner.teacher.get_new_examples(test_ids, test_labels,
+				time_left, test_scores=test_scores)
+		return self.winner.teacher.get_new_examples(test_ids, test_labels,
+			time_left)
+
+	def get_sample_weight(self, train_ids):
+		return self.winner.teacher.get_sample_weight(train_ids)
+
+	def get_column_mask(self, feature_importances, time_left: float):
+		mask = None
+		if self.winner.teacher.uses_column_mask:
+			mask = self.winner.teacher.get_column_mask(feature_importances,
+				time_left)
+		# the first time, the columns of the winner's learner
+		if mask is None and self.winner_columns is not None:
+			mask = np.zeros(get_qtd_columns(self.X), dtype=bool)
+			mask[self.winner_columns] = True
+		self.winner_columns = None
+		return mask
+
+	def get_winner_name(self) -> str:
+		return self.winner.teacher.name if self.winner is not None else None
+
+	def get_params(self) -> dict:
+		return {
+			"teachers": [(T.name, T.get_params()) for T in self.teachers],
+			"learner": self.learner.name,
+			"seed": self.seed,
+			"frac_explore": self.frac_explore,
+			"exploration": self.exploration,
+			"validation_size": self.validation_size,
+			"winner": self.get_winner_name(),
+			}
+
+	def _get_accuracy(self, h=None):
+		return self.winner.teacher._get_accuracy(h)
+
+class _Arm:
+	"""A teacher of the portfolio, with its own learner, run one
+	iteration of the protocol at a time"""
+	def __init__(self, teacher: Teacher, learner: Learner):
+		self.teacher = teacher
+		self.learner = learner
+
+	def start(self, X, y, time_left):
+		if self.teacher.uses_column_mask:
+			self.learner = ColumnSubsetLearner(self.learner)
+		self.learner.start()
+		if self.learner.uses_ids:
+			self.learner.set_dataset(X, y)
+		self.teacher.start(X, y, time_left)
+		self.m = y.size
+		self.train_ids = np.array([], dtype=get_ids_dtype(self.m))
+		self.qtd_steps = 0
+		self.done = False
+		self.accuracy = 0.0
+		self.last_gain = 0.0
+		self.last_step_time = 0.0
+		self._step_time = 0.0
+
+	def step(self, X, y, get_time_left):
+		t0 = default_timer()
+		T = self.teacher
+		if self.qtd_steps == 0:
+			new_ids = T.get_first_examples(get_time_left())
+		else:
+			(test_ids, test_labels, test_scores) = run_tests(T,
+				self.learner, X, get_time_left)
+			if T.uses_scores:
+				new_ids = T.get_new_examples(test_ids, test_labels,
+					get_time_left(), test_scores=test_scores)
+			else:
+				new_ids = T.get_new_examples(test_ids, test_labels,
+					get_time_left())
+			if T.uses_column_mask and len(new_ids) > 0:
+				update_columns(T, self.learner, get_time_left())
+		new_ids = wrapp_ids(new_ids, self.m)
+
+		if len(new_ids) == 0:
+			self.done = True
+		else:
+			self.train_ids = np.append(self.train_ids, new_ids)
+			fit(self.learner, X, y, self.train_ids,
+				get_sample_weight(T, self.train_ids))
+			if len(self.train_ids) >= self.m:
+				self.done = True
+		self.qtd_steps += 1
+		self._step_time = default_timer() - t0
+
+	def evaluate(self, X, y, validation_ids):
+		# accuracy on the validation examples the learner was not trained with
+		ids = validation_ids[~np.isin(validation_ids, self.train_ids)]
+		if len(ids) == 0 or self._step_time == 0.0:
+			return
+		accuracy = np.count_nonzero(predict(self.learner, X, ids) == y[ids]) / len(ids)
+		self.last_gain = (accuracy - self.accuracy) / self._step_time
+		self.last_step_time = self._step_time
+		self.accuracy = accuracy
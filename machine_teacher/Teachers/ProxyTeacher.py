@@ -0,0 +1,168 @@
+"""
+This module implements the ProxyTeacher, a teacher that ranks the
+candidate examples with a cheap proxy model, so that the (expensive)
+learner only classifies a small verification subset
+
+The proxy is a linear model (sklearn's SGDClassifier, over
+standardized rows) trained incrementally (partial_fit) with each
+batch sent to the learner, so it follows the teaching set without
+refitting. In each iteration, the proxy scores a pool of candidates
+(the next unsent ids, in a random order) and ranks them by the margin
+between its two best classes (the most uncertain first). The learner
+classifies only the top frac_verify of a batch, and the teacher
+sends: the verified examples that the learner misclassified, then the
+unverified candidates in the order of the proxy, then the verified
+examples that the learner got right. The candidates that are not sent
+go back to the end of the pool
+
+The accuracy estimated by the teacher (used by save_best_learner) is
+the accuracy on the verification subsets, the most uncertain examples
+for the proxy: it is pessimistic
+"""
+
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+
+from ..GenericTeacher import Teacher
+from ..Utils.Sampler import get_first_examples
+from ..Utils.IdPool import IdPool
+from ..Definitions import create_ids
+from ..Definitions import wrapp_ids
+
+class ProxyTeacher(Teacher):
+	"""
+	Parameters
+	-----------
+	seed: int -- seed of the random order of the examples and of the proxy
+	frac_start: float -- size of the first sample (fraction of the dataset)
+	candidates_factor: float -- size of the pool of candidates, in
+	number of batches (the batch size doubles in each iteration)
+	frac_verify: float -- size of the verification subset, as a
+	fraction of the batch
+	proxy_loss: str -- loss of the proxy (see SGDClassifier)
+	"""
+	name = "ProxyTeacher"
+	_SEED = 0
+	_FRAC_START = 0.01
+	_CANDIDATES_FACTOR = 4.0
+	_FRAC_VERIFY = 0.25
+	_PROXY_LOSS = "hinge"
+	_MIN_VERIFY = 10
+	_FIRST_PASSES = 5 # passes of the proxy over the first examples
+	_SCALER_SAMPLE_SIZE = 10000 # rows used to standardize the data
+
+	def __init__(self, seed: int = _SEED,
+		frac_start: float = _FRAC_START,
+		candidates_factor: float = _CANDIDATES_FACTOR,
+		frac_verify: float = _FRAC_VERIFY,
+		proxy_loss: str = _PROXY_LOSS):
+		self.seed = seed
+		self.frac_start = frac_start
+		self.candidates_factor = candidates_factor
+		self.frac_verify = frac_verify
+		self.proxy_loss = proxy_loss
+
+		assert 0.0 <= frac_start <= 1.0, "frac_start must be in [0, 1]"
+		assert candidates_factor >= 1.0, "candidates_factor must be at least 1"
+		assert 0.0 < frac_verify <= 1.0, "frac_verify must be in (0, 1]"
+
+	def start(self, X, y, time_left: float):
+		self._start(X, y, time_left)
+		self.num_iters = 0
+		self.m = y.size
+		self.S_current_size = 0
+		self.batch_size = 1
+		self.last_accuracy = 0.0
+
+		random_state = np.random.RandomState(self.seed)
+		ids = create_ids(self.m)
+		random_state.shuffle(ids)
+		self.id_pool = IdPool(ids)
+
+		# the scale of a sample of the rows (the proxy is linear)
+		sample = ids[:self._SCALER_SAMPLE_SIZE]
+		self.scaler = StandardScaler().fit(X[np.sort(sample)])
+		self.proxy = SGDClassifier(loss=self.proxy_loss,
+			random_state=self.seed)
+		self.candidates = None
+
+	def _keep_going(self):
+		return self.S_current_size < self.m
+
+	def get_first_examples(self, time_left: float):
+		f_shuffle = np.random.RandomState(self.seed).shuffle
+		new_ids = get_first_examples(self.frac_start, self.m,
+			self.label_index.classes, self.y, f_shuffle, self.label_index)
+		new_ids = wrapp_ids(new_ids, self.m)
+
+		self.id_pool.send(new_ids)
+		for __ in range(self._FIRST_PASSES):
+			self._update_proxy(new_ids)
+		self.batch_size = len(new_ids)
+		return self._send_new_ids(new_ids)
+
+	def get_new_test_ids(self, test_ids,
+		test_labels, time_left: float) -> np.ndarray:
+		if not self._keep_going() or len(test_ids) > 0:
+			return np.array([])
+
+		# the candidates, the most uncertain for the proxy first
+		qtd_candidates = int(np.ceil(self.candidates_factor * self.batch_size))
+		candidates = self.id_pool.get_unsent(0, qtd_candidates)
+		margins = self._get_proxy_margins(candidates)
+		self.candidates = candidates[np.argsort(margins, kind="stable")]
+
+		qtd_verify = max(self._MIN_VERIFY,
+			int(np.ceil(self.frac_verify * self.batch_size)))
+		return self.candidates[:qtd_verify]
+
+	def get_new_examples(self, test_ids, test_labels, time_left: float):
+		if not self._keep_going() or len(test_ids) == 0:
+			return np.array([])
+
+		wrong = self.y[test_ids] != test_labels
+		self.last_accuracy = 1.0 - np.count_nonzero(wrong)/len(test_ids)
+
+		# the test ids are the first candidates
+		qtd_verified = len(test_ids)
+		candidates = np.concatenate((test_ids[wrong],
+			self.candidates[qtd_verified:], test_ids[~wrong]))
+		k = min(self.batch_size, len(candidates))
+		new_ids = candidates[:k]
+		self.id_pool.send_and_park(new_ids, candidates[k:])
+		self.candidates = None
+
+		self._update_proxy(new_ids)
+		self.batch_size *= 2
+		return self._send_new_ids(new_ids)
+
+	def _update_proxy(self, ids):
+		self.proxy.partial_fit(self.scaler.transform(self.X[ids]),
+			self.y[ids], classes=self.label_index.classes)
+
+	def _get_proxy_margins(self, ids):
+		# margin between the two best classes (the label is not used:
+		# the examples with the highest loss are often label noise)
+		scores = self.proxy.decision_function(self.scaler.transform(self.X[ids]))
+		if scores.ndim == 1:
+			return 2 * np.abs(scores)
+		top2 = -np.partition(-scores, 1, axis=1)[:, :2]
+		return top2[:, 0] - top2[:, 1]
+
+	def _send_new_ids(self, new_ids):
+		self.num_iters += 1
+		self.S_current_size += len(new_ids)
+		return new_ids
+
+	def get_params(self) -> dict:
+		return {
+			"seed": self.seed,
+			"frac_start": self.frac_start,
+			"candidates_factor": self.candidates_factor,
+			"frac_verify": self.frac_verify,
+			"proxy_loss": self.proxy_loss,
+			}
+
+	def _get_accuracy(self, h=None):
+		return self.last_accuracy
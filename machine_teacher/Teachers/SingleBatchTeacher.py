@@ -1,4 +1,5 @@
 from ..GenericTeacher import Teacher
+from ..Definitions import create_ids
 import numpy as np
 import warnings
 from sklearn import preprocessing
@@ -29,7 +30,7 @@ class SingleBatchTeacher(Teacher):
 		return []
 
 	def _get_shuffled_ids(self):
-		ids = np.arange(self.m, dtype=int)
+		ids = create_ids(self.m)
 		f_shuffle = np.random.RandomState(self.seed).shuffle
 		f_shuffle(ids)
 		return ids
@@ -3,6 +3,9 @@
 from ..GenericTeacher import Teacher
 from ..Utils.Sampler import get_first_examples
 from ..Utils.Sampler import choose_ids
+from ..Utils.BitSet import BitSet
+from ..Definitions import create_ids
+from ..Definitions import wrapp_ids
 import numpy as np
 import warnings
 
@@ -13,20 +16,60 @@ _FRAC_STOP = 1.0
 _SEED = 0
 _FIRST_EXAMPLE_SEED = 0
 
+# scanning mode (see WTFTeacher)
+_SCAN_WRONG_FACTOR = 4.0
+_SCAN_TOLERANCE = 0.01
+_SCAN_DELTA = 0.05 # the error estimate is within the tolerance w.p. 1-delta
+_MAX_SAMPLE_WEIGHT = 5.0
+
 class WTFTeacher(Teacher):
+	"""
+	The teacher of the original article (OSCT)
+
+	By default, the learner classifies the whole dataset in every
+	iteration. If frac_scan_chunk is given (scanning mode), the
+	teacher asks the learner to classify random chunks of
+	frac_scan_chunk*m rows, and stops the test phase when
+	(1) it has scan_wrong_factor*n wrong examples or (2) the error
+	estimate is within scan_tolerance (Hoeffding bound) and there is
+	at least one wrong example. The weight of the wrong examples is
+	estimated from the scanned fraction f of the dataset as (sum of
+	weights)/f, and the weights of the scanned wrong examples increase
+	1/f times as much, so the expected weight update is the same as in
+	a full scan
+
+	If weighted is True, the learner is also trained with the weights w
+	of the examples, so the examples that were often misclassified are
+	emphasized without being sent again. The weights grow exponentially
+	(and the noisy examples get the largest ones), so they are relative
+	to the median weight, capped at max_sample_weight
+	"""
 	name = "WTFTeacher"
 	
 	def __init__(self, seed: int = _SEED,
 		frac_start: float = _FRAC_START,
 		frac_stop: float = _FRAC_STOP,
-		first_example_seed: int = _FIRST_EXAMPLE_SEED):
+		first_example_seed: int = _FIRST_EXAMPLE_SEED,
+		frac_scan_chunk: float = None,
+		scan_wrong_factor: float = _SCAN_WRONG_FACTOR,
+		scan_tolerance: float = _SCAN_TOLERANCE,
+		weighted: bool = False,
+		max_sample_weight: float = _MAX_SAMPLE_WEIGHT):
 		self.seed = seed
 		self.frac_start = frac_start
 		self.frac_stop = frac_stop
 		self.first_examples_seed = first_example_seed
+		self.frac_scan_chunk = frac_scan_chunk
+		self.scan_wrong_factor = scan_wrong_factor
+		self.scan_tolerance = scan_tolerance
+		self.weighted = weighted
+		self.uses_sample_weight = weighted
+		self.max_sample_weight = max_sample_weight
 		
 		assert 0.0 <= frac_start <= 1.0, "frac start most be in [0, 1]"
 		assert frac_start <= frac_stop <= 1.0, "frac start most be in [frac_start, 1]"
+		assert frac_scan_chunk is None or 0.0 < frac_scan_chunk <= 1.0, \
+			"frac_scan_chunk most be in (0, 1]"
 
 	def start(self, X, y, time_left: float) -> None:
 		super()._start(X, y, time_left)
@@ -36,19 +79,29 @@ class WTFTeacher(Teacher):
 		self.S_max_size = int(m * self.frac_stop)
 		#self.first_batch_size = int(m * self.frac_start)
 		self.num_iters = 0
-		self.selected = np.full(m, False)
+		self.selected = BitSet(m)
 		self._random = np.random.RandomState(self.seed)
 		self.w = np.full(m, 1/(2.0*m))	
 		self.samples = []
 		self.n = 1
 		#self.n = int(m * self.frac_start)
-		self.classes = np.unique(self.y)
+		self.classes = self.label_index.classes
 		self.S_current_size = 0
+		if self.frac_scan_chunk is not None:
+			self.scan_chunk_size = max(1, int(m * self.frac_scan_chunk))
+			self.scan_min_rows = int(np.ceil(np.log(2/_SCAN_DELTA) /
+				(2 * self.scan_tolerance**2)))
+			# each test phase scans consecutive slices of a random
+			# permutation, from a random position: every row is scanned
+			# with the same probability (the scanned fraction)
+			self._scan_random = np.random.RandomState(self.seed)
+			self.scan_order = create_ids(m)
+			self._scan_random.shuffle(self.scan_order)
+			self.scan_pos = 0
+			self.scan_qtd_wrong = 0
 
-	def _keep_going(self, test_labels) -> bool:
-		assert len(test_labels) == self.m
-
-		if len(self._get_delta_h(test_labels)) == 0:
+	def _keep_going(self, wrong_labels) -> bool:
+		if len(wrong_labels) == 0:
 			return False
 		elif self.S_current_size >= self.S_max_size:
 			return False
@@ -58,26 +111,27 @@ class WTFTeacher(Teacher):
 	def get_first_examples(self, time_left: float):
 		f_shuffle = np.random.RandomState(self.first_examples_seed).shuffle
 		new_ids = get_first_examples(self.frac_start, self.m,
-			self.classes, self.y, f_shuffle)
-		new_ids = np.array(new_ids)
+			self.classes, self.y, f_shuffle, self.label_index)
+		new_ids = wrapp_ids(new_ids, self.m)
 		return self._send_new_ids(new_ids)
 
 	def get_new_examples(self, test_ids, test_labels, time_left: float):
-		if not self._keep_going(test_labels):
+		wrong_labels = self._get_delta_h(test_ids, test_labels)
+		if not self._keep_going(wrong_labels):
 			return np.array([])
 
-		wrong_labels = self._get_delta_h(test_labels)
-		
+		frac_scanned = len(test_ids) / self.m
 		new_ids = []
-		while new_ids == []:
-			new_w, delta_w = self._get_new_weights_and_delta_w(wrong_labels)
+		while len(new_ids) == 0:
+			new_w, delta_w = self._get_new_weights_and_delta_w(wrong_labels,
+				frac_scanned)
 			self.w = new_w
-			new_ids = self._select_examples(wrong_labels, delta_w) #cabe melhoria
-			if new_ids == []:
+			new_ids = self._select_examples(wrong_labels, delta_w)
+			if len(new_ids) == 0:
 				self.n *= 2
 				new_w.fill(1/(2*self.m))
 
-		new_ids = np.array(new_ids)
+		new_ids = wrapp_ids(new_ids, self.m)
 		if self.S_current_size + len(new_ids) > self.S_max_size:
 			size = self.S_max_size - self.S_current_size
 			new_ids = new_ids[:size]
@@ -88,25 +142,59 @@ class WTFTeacher(Teacher):
 		# updates
 		self.num_iters += 1
 		self.S_current_size += len(new_ids)
-		self.selected[new_ids] = True
+		self.selected.add(new_ids)
 		
 		return new_ids
 
-	def _get_delta_h(self, test_labels):
-		delta_h = self._get_wrong_labels_id(test_labels)
-		self.last_accuracy = (self.m - len(delta_h))/(self.m)
-		delta_h = [i for i in delta_h if not self.selected[i]] #analisar se cabe melhoria com setdiff1d
-		delta_h = np.array(delta_h)
+	def get_new_test_ids(self, test_ids, test_labels, time_left: float):
+		if self.frac_scan_chunk is None:
+			return super().get_new_test_ids(test_ids, test_labels, time_left)
+
+		if len(test_ids) == 0:
+			self.scan_qtd_wrong = 0
+			self.scan_pos = self._scan_random.randint(self.m)
+		else:
+			# only the last chunk is new
+			last_ids = test_ids[-self.last_scan_chunk_size:]
+			last_labels = test_labels[-self.last_scan_chunk_size:]
+			last_wrong = last_ids[self.y[last_ids] != last_labels]
+			self.scan_qtd_wrong += np.count_nonzero(
+				~self.selected.contains(last_wrong))
+
+			if self.scan_qtd_wrong >= self.scan_wrong_factor * self.n:
+				return np.array([])
+			if self.scan_qtd_wrong > 0 and len(test_ids) >= self.scan_min_rows:
+				return np.array([])
+
+		size = min(self.scan_chunk_size, self.m - len(test_ids))
+		new_ids = self.scan_order[self.scan_pos:self.scan_pos + size]
+		if len(new_ids) < size: # wraps around
+			new_ids = np.append(new_ids, self.scan_order[:size - len(new_ids)])
+		self.scan_pos = (self.scan_pos + size) % self.m
+		self.last_scan_chunk_size = size
+		return new_ids
+
+	def _get_delta_h(self, test_ids, test_labels):
+		if self.frac_scan_chunk is None:
+			assert len(test_labels) == self.m
+			delta_h = self._get_wrong_labels_id(test_labels)
+		else:
+			delta_h = test_ids[self.y[test_ids] != test_labels]
+		self.last_accuracy = (len(test_ids) - len(delta_h))/(len(test_ids))
+		delta_h = delta_h[~self.selected.contains(delta_h)]
 		return delta_h
 
-	def _get_new_weights_and_delta_w(self, wrong_labels):
+	def _get_new_weights_and_delta_w(self, wrong_labels, frac_scanned = 1.0):
+		# wrong_labels may be a sample (a fraction frac_scanned) of the
+		# wrong examples: v and the weight increase are scaled up by
+		# 1/frac_scanned (Horvitz-Thompson), so they are unbiased
 		new_w = np.copy(self.w)
-		v = np.sum(new_w[wrong_labels])
+		v = np.sum(new_w[wrong_labels]) / frac_scanned
 
 		if v >= 1.0: #The algorithm failed
 			self.n *= 2
 			new_w.fill(1/(2*self.m))
-			v = (1/(2*self.m)) * wrong_labels.size
+			v = (1/(2*self.m)) * wrong_labels.size / frac_scanned
 		
 		k = 1
 		while v*k < 1.0:
@@ -114,6 +202,9 @@ class WTFTeacher(Teacher):
 
 		old_w = np.copy(new_w[wrong_labels])
 		new_w[wrong_labels] *= k
+		if frac_scanned < 1.0:
+			# the scanned rows also take the increase of the others
+			new_w[wrong_labels] = old_w + (new_w[wrong_labels] - old_w)/frac_scanned
 		delta_w = (new_w[wrong_labels] - old_w)/2
 		return (new_w, delta_w)
 
@@ -121,28 +212,23 @@ class WTFTeacher(Teacher):
 		random_numbers = self._random.rand(self.n)
 		random_numbers = np.sort(random_numbers)
 
-		j = 0
-		i = 0
-		aux = 0
-		flag = True
-		N = wrong_labels.size
-		S = []
-		while (j < self.n) and (i < N):
-			if flag:
-				aux += delta_w[i]
-			flag = False
-			if random_numbers[j] <= aux:				
-				if random_numbers[j] > (aux-delta_w[i]):
-					S.append(wrong_labels[i])
-					flag = True
-					i+=1
-				j+=1      
-			else:
-				i+=1
-				flag = True
-		
-		return S
+		# wrong_labels[i] is selected if some random number falls in
+		# (cum_w[i] - delta_w[i], cum_w[i]]. np.cumsum adds sequentially,
+		# so the bounds are the same of the original (python) loop
+		cum_w = np.cumsum(delta_w)
+		if cum_w.size == 0:
+			return wrong_labels[:0]
+
+		random_numbers = random_numbers[random_numbers <= cum_w[-1]]
+		pos = np.searchsorted(cum_w, random_numbers, side="left")
+		hit = random_numbers > (cum_w[pos] - delta_w[pos])
+		return wrong_labels[np.unique(pos[hit])]
 		
+	def get_sample_weight(self, train_ids):
+		w = self.w[train_ids]
+		w = np.minimum(w / np.median(w), self.max_sample_weight)
+		return w * (len(w) / np.sum(w))
+
 	def get_log_header(self):
 		return ["iter_number", "n", "training_set_size", "accuracy"]
 
@@ -158,6 +244,11 @@ class WTFTeacher(Teacher):
 			"seed": self.seed, 
 			"frac_start": self.frac_start,
 			"frac_stop": self.frac_stop,
+			"frac_scan_chunk": self.frac_scan_chunk,
+			"scan_wrong_factor": self.scan_wrong_factor,
+			"scan_tolerance": self.scan_tolerance,
+			"weighted": self.weighted,
+			"max_sample_weight": self.max_sample_weight,
 		}
 
 	def _get_accuracy(self, h=None):		
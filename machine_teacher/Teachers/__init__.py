@@ -2,3 +2,9 @@ from .WTFTeacher import WTFTeacher
 from .SingleBatchTeacher import SingleBatchTeacher
 from .DoubleTeacher import DoubleTeacher
 from .FixedPercWrongTeacher import FixedPercWrongTeacher
+from .MarginTeacher import MarginTeacher
+from .ClusterTeacher import ClusterTeacher
+from .PerClassErrorTeacher import PerClassErrorTeacher
+from .ProxyTeacher import ProxyTeacher
+from .PortfolioTeacher import PortfolioTeacher
+from .FeaturePruningTeacher import FeaturePruningTeacher
\ No newline at end of file
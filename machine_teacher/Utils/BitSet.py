@@ -0,0 +1,63 @@
+"""
+This module implements the class BitSet, a set of ids
+(row numbers) of a dataset with m rows, packed in m/8 bytes
+
+It replaces boolean masks (m bytes) and python sets in the
+membership tests performed by the teachers
+"""
+
+import numpy as np
+
+class BitSet:
+	"""
+	A set of integers in [0, m), one bit per integer
+
+	Methods
+	-----------
+	add(ids)
+		Adds the ids to the set
+
+	remove(ids)
+		Removes the ids from the set
+
+	contains(ids) -> np.ndarray
+		Returns a boolean vector, True for the ids in the set
+
+	to_ids() -> np.ndarray
+		Returns the (sorted) ids in the set
+	"""
+	def __init__(self, m: int, ids = None):
+		self.m = m
+		self._bits = np.zeros((m + 7) // 8, dtype=np.uint8)
+		if ids is not None:
+			self.add(ids)
+
+	def add(self, ids):
+		(pos, masks) = self._get_pos_and_masks(ids)
+		np.bitwise_or.at(self._bits, pos, masks)
+
+	def remove(self, ids):
+		(pos, masks) = self._get_pos_and_masks(ids)
+		np.bitwise_and.at(self._bits, pos, ~masks)
+
+	def contains(self, ids) -> np.ndarray:
+		(pos, masks) = self._get_pos_and_masks(ids)
+		return (self._bits[pos] & masks) != 0
+
+	def clear(self):
+		self._bits.fill(0)
+
+	def to_ids(self) -> np.ndarray:
+		mask = np.unpackbits(self._bits, count=self.m, bitorder="little")
+		return np.flatnonzero(mask)
+
+	def __len__(self):
+		return int(np.count_nonzero(np.unpackbits(self._bits)))
+
+	def _get_pos_and_masks(self, ids):
+		ids = np.asarray(ids).reshape(-1)
+		if ids.dtype.kind not in "iu":
+			ids = ids.astype(np.int64)
+		pos = ids >> 3
+		masks = np.left_shift(1, ids & 7).astype(np.uint8)
+		return (pos, masks)
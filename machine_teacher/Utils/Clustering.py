@@ -0,0 +1,78 @@
+"""
+This module computes a partition of the rows of a dataset in
+clusters (mini-batch k-means over the standardized features),
+used by the teachers to pick diverse examples
+
+The clustering is computed once per dataset: if a cache folder
+is given, the cluster of each row is saved in a file keyed by the
+dataset fingerprint (and the number of clusters), so runs with
+other seeds or other learners over the same dataset reuse it. The
+k-means always uses the same seed (_CLUSTERING_SEED)
+"""
+
+import os
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+
+from .Fingerprint import get_dataset_fingerprint
+from .Fingerprint import get_string_fingerprint
+from ..Definitions import get_labels_dtype
+
+_FILE_EXTENSION = ".npy"
+_MAX_FIT_ROWS = 100_000 # the centroids are computed over a sample
+_CHUNK_SIZE = 100_000 # rows assigned to the clusters at a time
+_CLUSTERING_SEED = 0 # the same clustering for all the runs
+
+def get_clusters(X, qtd_clusters: int,
+	cache_folder: str = None) -> np.ndarray:
+	"""Returns the cluster (from 0 to qtd_clusters-1) of each row of X
+
+	Parameters
+	-----------
+	X -- the data (features values), a matrix, where each row is an example
+	qtd_clusters: int -- the number of clusters
+	cache_folder: str -- folder of the cached clusterings (None: no cache)
+	"""
+	path = None
+	if cache_folder is not None:
+		os.makedirs(cache_folder, exist_ok = True)
+		key = get_string_fingerprint(repr((get_dataset_fingerprint(X),
+			qtd_clusters, _MAX_FIT_ROWS)))
+		path = os.path.join(cache_folder, "clusters_" + key + _FILE_EXTENSION)
+		if os.path.isfile(path):
+			return np.load(path)
+
+	clusters = _compute_clusters(X, qtd_clusters, _CLUSTERING_SEED)
+
+	if path is not None:
+		# atomic, concurrent runs may share the folder
+		tmp_path = path + ".tmp{}".format(os.getpid())
+		with open(tmp_path, "wb") as fp:
+			np.save(fp, clusters)
+		os.replace(tmp_path, path)
+
+	return clusters
+
+def _compute_clusters(X, qtd_clusters, seed):
+	m = X.shape[0]
+	qtd_clusters = max(1, min(qtd_clusters, m))
+	random_state = np.random.RandomState(seed)
+
+	sample = X
+	if m > _MAX_FIT_ROWS:
+		sample = X[np.sort(random_state.choice(m, _MAX_FIT_ROWS, replace=False))]
+	sample = np.asarray(sample, dtype=np.float64)
+	mean = sample.mean(axis=0)
+	std = sample.std(axis=0)
+	std[std == 0] = 1.0
+
+	kmeans = MiniBatchKMeans(n_clusters=qtd_clusters, random_state=seed,
+		n_init=3)
+	kmeans.fit((sample - mean) / std)
+
+	clusters = np.empty(m, dtype=get_labels_dtype(qtd_clusters))
+	for start in range(0, m, _CHUNK_SIZE):
+		chunk = np.asarray(X[start:start + _CHUNK_SIZE], dtype=np.float64)
+		clusters[start:start + _CHUNK_SIZE] = kmeans.predict((chunk - mean) / std)
+	return clusters
@@ -3,6 +3,7 @@ import pandas as pd
 from sklearn import preprocessing
 from sklearn.utils import shuffle
 import os
+from ..Definitions import compact_labels
 
 _SEP = ','
 _SHUFFLE_RANDOM_STATE = 0
@@ -158,7 +159,7 @@ def _tmp_load_dataset(path, is_numeric, scale):
 
 	# transforma os rótulos em inteiros a partir de zero
 	le = preprocessing.LabelEncoder()
-	y = le.fit_transform(y)
+	y = compact_labels(le.fit_transform(y), len(le.classes_))
 
 	# tira colunas (atributos) categóricos
 	if is_numeric:
@@ -203,7 +204,7 @@ def _tmp_load_dataset_train_test(path_train, path_test, is_numeric, scale):
 	le = preprocessing.LabelEncoder()
 	le.fit(y_train)
 
-	y_train = le.transform(y_train)
-	y_test = le.transform(y_test)
+	y_train = compact_labels(le.transform(y_train), len(le.classes_))
+	y_test = compact_labels(le.transform(y_test), len(le.classes_))
 
 	return (X_train, y_train, X_test, y_test)
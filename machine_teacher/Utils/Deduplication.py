@@ -0,0 +1,101 @@
+"""
+This module implements the class Deduplication, that collapses the
+duplicate examples (equal rows with the same label) of a dataset into
+unique examples with multiplicities
+
+The rows are hashed (a 64 bits hash of the bytes of each row) and
+grouped by hash; the groups are then checked against the rows, so a
+collision never merges different rows (if there is one, the rows are
+grouped by their bytes). Fitting a learner with the unique examples
+weighted by their multiplicities is the same as fitting it with all
+the duplicates, and the accuracy over the unique examples weighted
+by the multiplicities is the accuracy over the original rows
+"""
+
+import numpy as np
+
+from ..Definitions import get_ids_dtype
+
+_HASH_SEED = 0
+
+class Deduplication:
+	"""
+	The unique examples of a dataset (X, y)
+
+	Attributes
+	-----------
+	ids: np.ndarray -- ids[u] is the (first) row of unique example u
+	inverse: np.ndarray -- inverse[i] is the unique example of row i
+	multiplicity: np.ndarray -- multiplicity[u] is the number of rows
+	of unique example u
+
+	Methods
+	-----------
+	get_qtd_unique() -> int
+		Returns the number of unique examples
+
+	expand(h) -> np.ndarray
+		Returns the values h of the unique examples for each row
+	"""
+	def __init__(self, X, y):
+		X = np.asarray(X)
+		y = np.asarray(y).reshape(-1)
+		assert X.dtype != object, "the rows of X must be numeric"
+		m = y.size
+
+		# the groups of equal rows, then of equal (row, label) pairs
+		(__, row_inverse) = _get_unique_rows(X)
+		key = row_inverse.astype(np.int64) * (int(np.max(y)) + 1) + y
+		(__, ids, inverse, counts) = np.unique(key, return_index=True,
+			return_inverse=True, return_counts=True)
+
+		# the unique examples in the order of their first rows
+		order = np.argsort(ids, kind="stable")
+		rank = np.empty(order.size, dtype=np.int64)
+		rank[order] = np.arange(order.size)
+		self.ids = ids[order].astype(get_ids_dtype(m))
+		self.inverse = rank[inverse.reshape(-1)].astype(get_ids_dtype(order.size))
+		self.multiplicity = counts[order]
+
+	def get_qtd_unique(self) -> int:
+		return self.ids.size
+
+	def expand(self, h) -> np.ndarray:
+		return np.asarray(h)[self.inverse]
+
+def _get_unique_rows(X):
+	"""Returns (ids, inverse): the first row of each group of equal
+	rows and the group of each row"""
+	m = X.shape[0]
+	data = np.ascontiguousarray(X).reshape(m, -1).view(np.uint8).reshape(m, -1)
+	(ids, inverse) = _get_groups(_hash_rows(data))
+	# a collision: different rows with the same hash
+	if not np.array_equal(data, data[ids[inverse]]):
+		(ids, inverse) = _get_groups(data.view(
+			np.dtype((np.void, data.shape[1]))).reshape(-1))
+	return (ids, inverse)
+
+def _get_groups(keys):
+	(__, ids, inverse) = np.unique(keys, return_index=True,
+		return_inverse=True)
+	return (ids, inverse.reshape(-1))
+
+def _hash_rows(data):
+	# the bytes of each row as 64 bits words, mixed word by word
+	(m, qtd_bytes) = data.shape
+	qtd_words = (qtd_bytes + 7) // 8
+	if qtd_bytes % 8 != 0:
+		padded = np.zeros((m, qtd_words * 8), dtype=np.uint8)
+		padded[:, :qtd_bytes] = data
+		data = padded
+	words = np.ascontiguousarray(data).view(np.uint64)
+
+	random_state = np.random.RandomState(_HASH_SEED)
+	multipliers = random_state.randint(1, 2**62, size=qtd_words,
+		dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+	h = np.full(m, np.uint64(qtd_bytes))
+	for j in range(qtd_words):
+		h ^= words[:, j]
+		h *= multipliers[j]
+		h ^= h >> np.uint64(29)
+	return h
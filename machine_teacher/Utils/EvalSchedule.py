@@ -0,0 +1,84 @@
+"""
+This module implements the evaluation schedules used by the
+Protocol module to decide in which iterations the learner is
+evaluated (classifies the whole dataset and the test set) to
+build the log line. The other iterations only log times
+
+A schedule is a callable f(qtd_iters, elapsed_time) -> bool
+and can be created from a specification (see get_eval_schedule):
+	None or "all" -- every iteration
+	k (int) or "every:k" -- iterations 1, 1+k, 1+2k, ...
+	"geometric:r" -- iterations 1, 2, 4, 8, ... (for r = 2)
+	"time:s" -- every s seconds (of elapsed time)
+	a callable -- used as it is
+
+The protocol always evaluates the first and the last iterations
+"""
+
+import numpy as np
+
+_SEP = ":"
+
+def get_eval_schedule(spec = None):
+	"""Returns a (new) evaluation schedule from its specification"""
+	if spec is None:
+		return _every_iteration
+	elif callable(spec):
+		return spec
+	elif isinstance(spec, (int, np.integer)):
+		return EveryKSchedule(spec)
+
+	(kind, __, value) = str(spec).partition(_SEP)
+	kind = kind.strip().lower()
+	if kind == "all":
+		return _every_iteration
+	elif kind == "every":
+		return EveryKSchedule(int(value))
+	elif kind == "geometric":
+		return GeometricSchedule(float(value) if value else 2.0)
+	elif kind == "time":
+		return TimeSchedule(float(value))
+	else:
+		raise ValueError("unknown evaluation schedule: " + str(spec))
+
+def _every_iteration(qtd_iters, elapsed_time):
+	return True
+
+class EveryKSchedule:
+	"""Evaluates iterations 1, 1+k, 1+2k, ..."""
+	def __init__(self, k: int):
+		assert k >= 1, "k must be positive"
+		self.k = k
+
+	def __call__(self, qtd_iters, elapsed_time):
+		return (qtd_iters - 1) % self.k == 0
+
+class GeometricSchedule:
+	"""Evaluates iterations 1, r, r^2, ... (rounded up)"""
+	def __init__(self, ratio: float = 2.0):
+		assert ratio > 1.0, "ratio must be greater than 1"
+		self.ratio = ratio
+		self.next_iter = 1.0
+
+	def __call__(self, qtd_iters, elapsed_time):
+		if qtd_iters < self.next_iter:
+			return False
+
+		while self.next_iter <= qtd_iters:
+			self.next_iter = np.ceil(self.next_iter * self.ratio)
+		return True
+
+class TimeSchedule:
+	"""Evaluates an iteration if at least 'interval' seconds have
+	passed since the last evaluated iteration"""
+	def __init__(self, interval: float):
+		self.interval = interval
+		self.last_time = None
+
+	def __call__(self, qtd_iters, elapsed_time):
+		if (self.last_time is not None and
+			elapsed_time < self.last_time + self.interval):
+			return False
+
+		self.last_time = elapsed_time
+		return True
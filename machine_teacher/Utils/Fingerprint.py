@@ -0,0 +1,42 @@
+"""
+A colection of methods to compute fingerprints (hashes) of
+datasets and of sets of examples ids. Fingerprints are used
+as keys of on-disk caches, so that results computed for a
+dataset can be reused by other runs over the same dataset
+"""
+
+import hashlib
+import numpy as np
+
+_DIGEST_SIZE = 16 # in bytes
+
+def get_dataset_fingerprint(X, y = None) -> str:
+	"""Returns a fingerprint of the dataset (X, y), based on the
+	shape, the dtype and the content of X (and y)"""
+	h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+	for v in (X, y):
+		if v is None:
+			continue
+		v = np.ascontiguousarray(v)
+		h.update(str((v.shape, v.dtype.str)).encode())
+		h.update(memoryview(v).cast("B"))
+
+	return h.hexdigest()
+
+def get_ids_fingerprint(ids) -> str:
+	"""Returns a fingerprint of the set of ids (the order of the
+	ids is irrelevant)"""
+	ids = np.sort(np.asarray(ids, dtype=np.int64).reshape(-1))
+	return get_array_fingerprint(ids)
+
+def get_array_fingerprint(v) -> str:
+	"""Returns a fingerprint of the content of the array v"""
+	v = np.ascontiguousarray(v)
+	h = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+	h.update(v.dtype.str.encode())
+	h.update(memoryview(v).cast("B"))
+	return h.hexdigest()
+
+def get_string_fingerprint(s: str) -> str:
+	"""Returns a fingerprint of the string s"""
+	return hashlib.blake2b(s.encode(), digest_size=_DIGEST_SIZE).hexdigest()
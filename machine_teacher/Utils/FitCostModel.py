@@ -0,0 +1,124 @@
+"""
+This module implements the FitCostModel, a model of the time the
+learner takes to fit a training set of a given size, learned during
+the teaching session, and the AdaptiveBatchMixin, that teachers use
+to choose batch sizes that the learner can fit in the time left
+
+The teacher does not measure the fit directly: it only sees the
+time left informed in each call. The fit starts right after the
+teacher sends new examples and the next call (the first call to
+get_new_test_ids of the next iteration) comes right after the fit,
+so the difference between the two time lefts is the fit time
+(plus a small overhead of the protocol)
+"""
+
+import numpy as np
+
+_MIN_TIME = 1e-4 # in seconds, shorter times are not observed
+_MIN_EXPONENT = 1.0 # at least linear: the examples must be read
+_MAX_EXPONENT = 3.0
+_DEFAULT_EXPONENT = 1.0
+_QTD_RECENT = 3 # the fit times grow faster for large sizes: only the
+				# recent (largest) observations are used
+
+class FitCostModel:
+	"""
+	A power law model of the fit time: time(n) = a * n^b, where n
+	is the size of the training set, adjusted (least squares, in
+	log-log scale) to the last observed fit times
+
+	Methods
+	-----------
+	observe(n, time)
+		Records that fitting n examples took time seconds
+
+	predict(n) -> float
+		Returns the expected time to fit n examples (None if there
+		is no observation)
+
+	get_max_size(time) -> int
+		Returns the largest n expected to be fitted in time seconds
+		(None if there is no observation)
+	"""
+	def __init__(self):
+		self.sizes = []
+		self.times = []
+		self.a = None
+		self.b = None
+
+	def observe(self, n: int, time: float):
+		if n <= 0 or time < _MIN_TIME:
+			return
+		self.sizes.append(n)
+		self.times.append(time)
+		self._adjust()
+
+	def _adjust(self):
+		log_n = np.log(self.sizes[-_QTD_RECENT:])
+		log_t = np.log(self.times[-_QTD_RECENT:])
+		if np.ptp(log_n) > 0:
+			(b, __) = np.polyfit(log_n, log_t, 1)
+			b = float(np.clip(b, _MIN_EXPONENT, _MAX_EXPONENT))
+		else:
+			b = _DEFAULT_EXPONENT
+		self.b = b
+		self.a = float(np.exp(np.mean(log_t - b * log_n)))
+
+	def predict(self, n: int) -> float:
+		if self.a is None:
+			return None
+		return self.a * n**self.b
+
+	def get_max_size(self, time: float) -> int:
+		if self.a is None:
+			return None
+		if time <= 0:
+			return 0
+		return int((time / self.a)**(1.0 / self.b))
+
+class AdaptiveBatchMixin:
+	"""
+	Chooses the batch sizes of a teacher with a FitCostModel:
+	the batch is reduced if the fit of the next training set is not
+	expected to end (with a safety margin) before the time is over,
+	and increased to the largest possible one if there is no time
+	for another iteration
+
+	The teacher calls _start_fit_cost in start, _fit_started when it
+	sends examples (and a fit will start), _fit_ended in the first call
+	of an iteration and _get_adaptive_batch_size to choose a batch
+	"""
+	def _start_fit_cost(self, fit_time_margin: float):
+		self.fit_cost = FitCostModel()
+		self.fit_time_margin = fit_time_margin
+		self._fit_size = None
+		self._fit_time_left = None
+
+	def _fit_started(self, train_size: int, time_left: float):
+		self._fit_size = train_size
+		self._fit_time_left = time_left
+
+	def _fit_ended(self, time_left: float):
+		if self._fit_size is not None:
+			self.fit_cost.observe(self._fit_size,
+				self._fit_time_left - time_left)
+			self._fit_size = None
+
+	def _get_adaptive_batch_size(self, train_size: int, batch_size: int,
+		time_left: float, max_batch_size: int) -> int:
+		"""Returns the size of the next batch, given the current size of
+		the training set and the size the teacher would choose"""
+		budget = time_left / (1.0 + self.fit_time_margin)
+		max_size = self.fit_cost.get_max_size(budget)
+		if max_size is None:
+			return min(batch_size, max_batch_size)
+
+		max_batch = max(1, min(max_size - train_size, max_batch_size))
+		batch_size = min(batch_size, max_batch)
+
+		# no time for the next (doubled) batch: the largest possible one
+		next_size = train_size + 3*batch_size
+		if (self.fit_cost.predict(train_size + batch_size) +
+			self.fit_cost.predict(next_size) > budget):
+			batch_size = max_batch
+		return batch_size
@@ -0,0 +1,115 @@
+"""
+This module implements the class GroupPool, the pool of unsent ids
+of a dataset partitioned in groups (clusters, classes...), used by the
+teachers that split each batch among the groups, and the function
+allocate, that splits a batch in integer quotas
+
+The ids are kept in a single array, sorted by group (each group in a
+random order). The unsent ids of a group are a contiguous segment,
+that starts at a pointer: reading, reordering and sending the first
+ids of the groups costs O(batch + qtd_groups), not O(m)
+"""
+
+import numpy as np
+
+from ..Definitions import get_ids_dtype
+
+class GroupPool:
+	"""
+	The unsent ids of each group, in a random order
+
+	Parameters
+	-----------
+	groups -- the group (from 0 to qtd_groups-1) of each id
+	qtd_groups: int -- the number of groups
+	seed: int -- seed of the order of the ids
+
+	Methods
+	-----------
+	get_remaining() -> np.ndarray
+		Returns the number of unsent ids of each group
+
+	get_next(counts) -> np.ndarray
+		Returns the first counts[g] unsent ids of each group g,
+		group after group
+
+	set_next(ids, counts)
+		Reorders the first counts[g] unsent ids of each group: ids
+		must be a permutation of get_next(counts) that keeps the
+		ids of each group in the segment of the group
+
+	send_next(counts) -> np.ndarray
+		Sends (and returns) the first counts[g] unsent ids of each group
+
+	send(i)
+		Sends the (unsent) id i
+	"""
+	def __init__(self, groups, qtd_groups: int, seed: int):
+		m = len(groups)
+		ids = np.random.RandomState(seed).permutation(m)
+		ids = ids[np.argsort(groups[ids], kind="stable")]
+		self.order = ids.astype(get_ids_dtype(m))
+		self.position = np.empty(m, dtype=np.int64)
+		self.position[self.order] = np.arange(m)
+		counts = np.bincount(groups, minlength=qtd_groups)
+		self.end = np.cumsum(counts)
+		self.first = self.end - counts
+
+	def get_qtd_groups(self) -> int:
+		return self.first.size
+
+	def get_remaining(self) -> np.ndarray:
+		return self.end - self.first
+
+	def get_next(self, counts) -> np.ndarray:
+		return np.concatenate([self.order[self.first[g]:self.first[g] + c]
+			for (g, c) in enumerate(counts)])
+
+	def set_next(self, ids, counts):
+		starts = np.concatenate(([0], np.cumsum(counts)))
+		for g in np.flatnonzero(counts):
+			positions = np.arange(self.first[g], self.first[g] + counts[g])
+			self.order[positions] = ids[starts[g]:starts[g+1]]
+			self.position[ids[starts[g]:starts[g+1]]] = positions
+
+	def send_next(self, counts) -> np.ndarray:
+		new_ids = self.get_next(counts)
+		self.first += counts
+		return new_ids
+
+	def send(self, i):
+		# moves the id to the start of its group and sends it
+		p = self.position[i]
+		g = np.searchsorted(self.end, p, side="right")
+		f = self.first[g]
+		assert p >= f, "id already sent"
+		(self.order[p], self.order[f]) = (self.order[f], self.order[p])
+		self.position[self.order[p]] = p
+		self.position[i] = f
+		self.first[g] += 1
+
+def allocate(n: int, capacities, weights) -> np.ndarray:
+	"""Splits n in integer quotas proportional to the weights (largest
+	remainder method), where quota[g] <= capacities[g]. If the weights
+	of the groups with capacity are zero, splits n equally"""
+	capacities = np.asarray(capacities, dtype=np.int64)
+	weights = np.where(capacities > 0, np.asarray(weights, dtype=np.float64), 0.0)
+	quotas = np.zeros(capacities.size, dtype=np.int64)
+	n = min(n, int(capacities.sum()))
+	while n > 0:
+		free = capacities - quotas
+		w = np.where(free > 0, weights, 0.0)
+		if w.sum() <= 0:
+			w = (free > 0).astype(np.float64)
+		share = n * w / w.sum()
+		add = np.minimum(np.floor(share).astype(np.int64), free)
+		# the rest, one by one, to the largest remainders
+		rest = n - add.sum()
+		if rest > 0:
+			remainder = np.where(free - add > 0, share - add, -np.inf)
+			best = np.argsort(-remainder, kind="stable")[:rest]
+			best = best[remainder[best] > -np.inf]
+			add[best] += 1
+		quotas += add
+		n -= add.sum()
+	return quotas
@@ -0,0 +1,112 @@
+"""
+This module implements the class IdPool, the (ordered) pool of
+ids a teacher draws its examples from
+
+The ids are partitioned in: sent (given to the learner), untested
+and tested-and-unsent (parked). The unsent ids form a queue: the
+untested ones, in their original order, followed by the parked ones,
+in the order they were parked. The queue is a circular buffer, so
+reading, sending and parking a batch cost O(batch), not O(m)
+"""
+
+import numpy as np
+
+from .BitSet import BitSet
+
+class IdPool:
+	"""
+	An ordered pool of ids: sent | untested | parked
+
+	Methods
+	-----------
+	send(ids) -> np.ndarray
+		Sends arbitrary (unsent) ids, keeping the order of the
+		others. Costs O(m): use it once, for the first examples
+
+	send_next(k) -> np.ndarray
+		Sends the first k unsent ids
+
+	get_unsent(start, end) -> np.ndarray
+		Returns the unsent ids in positions [start, end) of the queue
+
+	send_and_park(new_ids, parked_ids)
+		Consumes the first len(new_ids) + len(parked_ids) unsent ids
+		(a tested prefix of the queue): new_ids are sent and parked_ids
+		go to the end of the queue
+	"""
+	def __init__(self, ids):
+		self.m = len(ids)
+		self._sent = np.empty_like(ids)
+		self._queue = np.array(ids)
+		self._head = 0 # position of the first unsent id
+		self.qtd_sent = 0
+		self.qtd_unsent = self.m
+		self.qtd_parked = 0
+
+	def get_sent(self) -> np.ndarray:
+		return self._sent[:self.qtd_sent]
+
+	def get_qtd_untested(self) -> int:
+		return self.qtd_unsent - self.qtd_parked
+
+	def send(self, ids) -> np.ndarray:
+		ids = np.asarray(ids, dtype=self._queue.dtype)
+		unsent = self.get_unsent(0, self.qtd_unsent)
+		_ids = BitSet(self.m, ids)
+		is_sent = _ids.contains(unsent)
+
+		# the parked ids are at the end of the queue
+		qtd_untested = self.get_qtd_untested()
+		self.qtd_parked -= np.count_nonzero(is_sent[qtd_untested:])
+
+		unsent = unsent[~is_sent]
+		assert len(unsent) + len(ids) == self.qtd_unsent, "ids already sent"
+		self._queue[:len(unsent)] = unsent
+		self._head = 0
+		self.qtd_unsent = len(unsent)
+		self._append_sent(ids)
+		return ids
+
+	def send_next(self, k: int) -> np.ndarray:
+		k = min(k, self.qtd_unsent)
+		new_ids = self.get_unsent(0, k)
+		self._pop(k)
+		self._append_sent(new_ids)
+		return new_ids
+
+	def get_unsent(self, start: int, end: int) -> np.ndarray:
+		end = min(end, self.qtd_unsent)
+		start = min(start, end)
+		# a copy: the buffer is overwritten as ids are sent and parked
+		return self._queue[self._get_positions(start, end)].copy()
+
+	def send_and_park(self, new_ids, parked_ids):
+		k = len(new_ids) + len(parked_ids)
+		assert k <= self.qtd_unsent
+		self._pop(k)
+		self._append_sent(new_ids)
+
+		pos = self._get_positions(self.qtd_unsent,
+			self.qtd_unsent + len(parked_ids))
+		self._queue[pos] = parked_ids
+		self.qtd_unsent += len(parked_ids)
+		self.qtd_parked += len(parked_ids)
+
+	def _pop(self, k):
+		# the untested ids are consumed first
+		qtd_untested = self.get_qtd_untested()
+		self.qtd_parked -= max(0, k - qtd_untested)
+		self._head = (self._head + k) % max(self.m, 1)
+		self.qtd_unsent -= k
+
+	def _append_sent(self, ids):
+		self._sent[self.qtd_sent:self.qtd_sent + len(ids)] = ids
+		self.qtd_sent += len(ids)
+
+	def _get_positions(self, start, end):
+		# positions in the (circular) buffer of the queue [start, end)
+		start += self._head
+		end += self._head
+		if end <= self.m:
+			return slice(start, end)
+		return np.arange(start, end) % self.m
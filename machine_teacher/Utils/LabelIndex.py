@@ -0,0 +1,45 @@
+"""
+This module implements the class LabelIndex, an index from each
+class (label) of a dataset to the ids of its rows
+
+It is built once per dataset (an argsort and a bincount of the
+labels), so the teachers do not need to scan the labels to count
+the classes or to find the examples of a class
+"""
+
+import numpy as np
+
+from ..Definitions import get_ids_dtype
+
+class LabelIndex:
+	"""
+	The ids of the rows of each class of a dataset
+
+	The labels must be integers from 0 to qtd_classes-1
+
+	Attributes
+	-----------
+	classes: np.ndarray -- the classes with at least one row (as np.unique)
+	counts: np.ndarray -- counts[c] is the number of rows of class c
+
+	Methods
+	-----------
+	get_ids(c) -> np.ndarray
+		Returns the (sorted) ids of the rows of class c
+	"""
+	def __init__(self, y):
+		y = np.asarray(y).reshape(-1)
+		self.m = y.size
+		self.counts = np.bincount(y) if y.size > 0 else np.zeros(0, dtype=np.int64)
+		self.classes = np.flatnonzero(self.counts).astype(y.dtype)
+		self.offsets = np.zeros(self.counts.size + 1, dtype=np.int64)
+		self.offsets[1:] = np.cumsum(self.counts)
+		self._ids = np.argsort(y, kind="stable").astype(get_ids_dtype(y.size))
+
+	def get_qtd_classes(self) -> int:
+		return self.classes.size
+
+	def get_ids(self, c) -> np.ndarray:
+		if c >= self.counts.size:
+			return self._ids[:0]
+		return self._ids[self.offsets[c]:self.offsets[c+1]]
@@ -0,0 +1,89 @@
+"""
+This module implements the class ModelCache, an on-disk cache
+of fitted learners (and of theirs predictions over the whole
+dataset)
+
+An entry is keyed by the learner name, the learner parameters,
+the dataset fingerprint and the fingerprint of the (sorted) ids
+of the training set. So, two runs that fit the same learner
+configuration over exactly the same rows of the same dataset
+share the entry, and the second one does not need to fit
+"""
+
+import os
+import pickle
+import warnings
+
+import numpy as np
+
+from .Fingerprint import get_ids_fingerprint
+from .Fingerprint import get_array_fingerprint
+from .Fingerprint import get_string_fingerprint
+
+_FILE_EXTENSION = ".pkl"
+
+class ModelCache:
+	"""
+	A folder of pickled (learner, predictions) pairs
+
+	Methods
+	-----------
+	get_key(L, dataset_fingerprint, train_ids, sample_weight = None) -> str
+		Returns the key of the entry of learner L fitted
+		with the examples train_ids
+
+	load(key, L) -> (bool, h)
+		If there is an entry for key, loads the fitted model
+		into L and returns (True, h), where h are the cached
+		predictions (or None). Otherwise, returns (False, None)
+
+	save(key, L, h = None)
+		Saves the fitted learner L (and its predictions h)
+	"""
+	def __init__(self, folder_path: str):
+		os.makedirs(folder_path, exist_ok = True)
+		self.folder_path = folder_path
+		self.qtd_hits = 0
+		self.qtd_misses = 0
+
+	def get_key(self, L, dataset_fingerprint: str, train_ids,
+		sample_weight = None) -> str:
+		params = sorted((str(k), repr(v)) for (k, v) in L.get_params().items())
+		key = (L.name, params, dataset_fingerprint,
+			get_ids_fingerprint(train_ids))
+		if sample_weight is not None:
+			# in the order of the ids, as the ids fingerprint
+			order = np.argsort(np.asarray(train_ids).reshape(-1), kind="stable")
+			sample_weight = np.asarray(sample_weight, dtype=np.float64)[order]
+			key = key + (get_array_fingerprint(sample_weight),)
+		return get_string_fingerprint(repr(key))
+
+	def load(self, key: str, L):
+		path = self._get_path(key)
+		if not os.path.isfile(path):
+			self.qtd_misses += 1
+			return (False, None)
+
+		with open(path, "rb") as fp:
+			(cached_L, h) = pickle.load(fp)
+
+		L.__dict__.update(cached_L.__dict__)
+		self.qtd_hits += 1
+		return (True, h)
+
+	def save(self, key: str, L, h = None):
+		path = self._get_path(key)
+		tmp_path = path + ".tmp{}".format(os.getpid())
+		try:
+			with open(tmp_path, "wb") as fp:
+				pickle.dump((L, h), fp, protocol = pickle.HIGHEST_PROTOCOL)
+		except (TypeError, AttributeError, pickle.PicklingError) as e:
+			warnings.warn("learner {} cannot be cached: {}".format(L.name, e))
+			os.remove(tmp_path)
+			return
+
+		# atomic, concurrent runs may share the folder
+		os.replace(tmp_path, path)
+
+	def _get_path(self, key: str) -> str:
+		return os.path.join(self.folder_path, key + _FILE_EXTENSION)
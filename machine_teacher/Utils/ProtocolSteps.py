@@ -0,0 +1,107 @@
+"""
+This module implements the steps of an interaction between a teacher
+and a learner (see Protocol): the test phase, the fits and the
+predictions of the learner, the weights and the columns chosen by the
+teacher. They are shared by the protocol and by the teachers that run
+interactions of their own (see Teachers.PortfolioTeacher)
+"""
+
+import numpy as np
+
+from ..GenericTeacher import Teacher
+from ..GenericLearner import Learner
+from ..Learners.ColumnSubsetLearner import ColumnSubsetLearner
+
+from ..Definitions import InputSpace
+from ..Definitions import Labels
+from ..Definitions import get_qtd_rows
+from ..Definitions import get_ids_dtype
+from ..Definitions import wrapp_ids
+from ..Definitions import get_labels_dtype
+
+def run_tests(T: Teacher, L: Learner,
+	X: InputSpace, get_time_left):
+	# the scores are only computed if the teacher uses them
+	# and the learner supports them (otherwise, test_scores is None)
+	with_scores = T.uses_scores and L.supports_scores
+	test_ids = np.array([], dtype=get_ids_dtype(get_qtd_rows(X)))
+	test_labels = np.array([], dtype=get_labels_dtype(2))
+	test_scores = [] if with_scores else None
+
+	while len(test_ids) <= get_qtd_rows(X):
+		new_test_ids = T.get_new_test_ids(test_ids, test_labels, get_time_left())
+		if len(new_test_ids) > 0:
+			assert len(new_test_ids) + len(test_ids) <= get_qtd_rows(X)
+
+			new_test_ids = wrapp_ids(new_test_ids, get_qtd_rows(X))
+			if with_scores:
+				new_test_labels, new_test_scores = predict_with_scores(L,
+					X, new_test_ids)
+				test_scores.append(new_test_scores)
+			else:
+				new_test_labels = predict(L, X, new_test_ids)
+			test_ids = np.append(test_ids, new_test_ids)
+			test_labels = np.append(test_labels, new_test_labels)
+		else:
+			break
+
+	if with_scores:
+		# the same model: the same columns in all the blocks
+		test_scores = (np.concatenate(test_scores) if len(test_scores) > 0
+			else np.zeros((0, 0)))
+	return (test_ids, test_labels, test_scores)
+
+def update_columns(T: Teacher, L: ColumnSubsetLearner, time_left: float):
+	# the new columns are used from the next fit on
+	importances = None
+	if L.supports_feature_importances:
+		importances = L.get_feature_importances()
+	mask = T.get_column_mask(importances, time_left)
+	if mask is not None:
+		L.set_columns(np.flatnonzero(mask))
+
+def fit(L: Learner, X: InputSpace, X_labels: Labels, ids,
+	sample_weight = None):
+	# the weights are only passed if given: learners that do
+	# not weight the examples keep working
+	kwargs = {} if sample_weight is None else {"sample_weight": sample_weight}
+	if L.uses_ids:
+		L.fit_ids(ids, **kwargs)
+	else:
+		L.fit(X[ids], X_labels[ids], **kwargs)
+
+def partial_fit(L: Learner, X: InputSpace, X_labels: Labels, ids,
+	sample_weight = None):
+	kwargs = {} if sample_weight is None else {"sample_weight": sample_weight}
+	if L.uses_ids:
+		L.partial_fit_ids(ids, **kwargs)
+	else:
+		L.partial_fit(X[ids], X_labels[ids], **kwargs)
+
+def get_sample_weight(T: Teacher, ids, multiplicity = None, trace = None):
+	# the weights of the teacher times the multiplicities of the examples
+	# (the weights of the teacher are recorded in the trace, if given)
+	sample_weight = None
+	if T.uses_sample_weight:
+		sample_weight = np.asarray(T.get_sample_weight(ids), dtype=np.float64)
+		assert sample_weight.shape == (len(ids),)
+		if trace is not None:
+			trace.add_sample_weight(sample_weight)
+	if multiplicity is not None:
+		counts = multiplicity[ids].astype(np.float64)
+		sample_weight = counts if sample_weight is None else sample_weight * counts
+	return sample_weight
+
+def predict(L: Learner, X: InputSpace, ids = None):
+	# ids = None means the entire dataset X
+	if not L.uses_ids:
+		return L.predict(X) if ids is None else L.predict(X[ids])
+
+	if ids is None:
+		ids = np.arange(get_qtd_rows(X))
+	return L.predict_ids(ids)
+
+def predict_with_scores(L: Learner, X: InputSpace, ids):
+	if L.uses_ids:
+		return L.predict_ids_with_scores(ids)
+	return L.predict_with_scores(X[ids])
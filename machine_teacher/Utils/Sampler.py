@@ -4,63 +4,71 @@ A colection of methods to sample examples from datasets
 
 import numpy as np
 
-def get_first_examples(prop, m, classes, y, shuffle_function):
+from ..Definitions import create_ids
+from .LabelIndex import LabelIndex
+from .WeightedSampler import WeightedSampler
+
+_MIN_PREFIX_SIZE = 1024
+
+def get_first_examples(prop, m, classes, y, shuffle_function,
+	label_index = None):
 	"""
 	Selects a sample of size prop*m, with two constraints:
 	(1) there must be at least one example from each class
 	(2) the distribution of classes in the sample is the same
 	as the distribution of classes in the entire dataset
 	(except from roundings)
+
+	The ids 0..m-1 are shuffled with shuffle_function and, for each
+	class, the first ids (in the shuffled order) of the class are
+	taken. The sample is returned in the shuffled order
+
+	label_index (a LabelIndex of y) is built if not given. The
+	classes are taken from it (the argument classes is not used)
 	"""
-	new_ids = []
+	if label_index is None:
+		label_index = LabelIndex(y)
 	n_samples = prop*m
-	class_distribution = [0 for c in classes]
-	
-	for c in y:
-		class_distribution[c] += 1
-	
-	class_samples = _get_class_samples(n_samples, m, class_distribution)
-	n_samples = np.sum(class_samples)
-	
-	v_cont = [0] * len(classes)
-	aux = [i for i in range(m)]
-	shuffle_function(aux)
-	
-	cont = 0
-	i = 0
-	while (cont < n_samples):
-		id_i = aux[i]
-		class_i = y[id_i]
-		if v_cont[class_i] < class_samples[class_i]:
-			new_ids.append(id_i)
-			cont += 1
-			v_cont[class_i] += 1
-		i+=1
+	class_samples = _get_class_samples(n_samples, m, label_index.counts)
 
-	return new_ids
+	shuffled_ids = create_ids(m)
+	shuffle_function(shuffled_ids)
 
-def _get_class_samples(n_samples, m, class_distribution):
-	class_samples = [0]*len(class_distribution)
+	# the shortest prefix (doubling its size) of the shuffled ids
+	# with enough examples of each class
+	size = min(m, max(2*int(np.sum(class_samples)), _MIN_PREFIX_SIZE))
+	while True:
+		prefix = shuffled_ids[:size]
+		labels = np.asarray(y)[prefix]
+		prefix_counts = np.bincount(labels, minlength=class_samples.size)
+		if size == m or np.all(prefix_counts >= class_samples):
+			break
+		size = min(m, 2*size)
 
-	for (i, tot_class_i) in enumerate(class_distribution):
-		qtd_class_i = np.ceil(tot_class_i/m * n_samples)
-		qtd_class_i = min(qtd_class_i, tot_class_i)
-		class_samples[i] = qtd_class_i
+	# rank of each example among the examples of its class in the prefix
+	order = np.argsort(labels, kind="stable")
+	starts = np.cumsum(prefix_counts) - prefix_counts
+	ranks = np.empty(size, dtype=np.int64)
+	ranks[order] = np.arange(size) - starts[labels[order]]
 
-	return class_samples
+	return prefix[ranks < class_samples[labels]]
 
-def choose_ids(population, weights, n):
-	# creates artificial element to make probabilites sums to 1
-	weights_2 = np.append(weights, 1.0 - np.sum(weights))
-	population_2 = np.append(population, len(population))
-	
-	# performs sampling with repetition
-	new_ids = np.random.choice(population_2, n,
-		replace = True, p = weights_2)
+def _get_class_samples(n_samples, m, class_distribution):
+	class_distribution = np.asarray(class_distribution)
+	class_samples = np.ceil(class_distribution/m * n_samples)
+	class_samples = np.minimum(class_samples, class_distribution)
+	return class_samples.astype(np.int64)
+
+def choose_ids(population, weights, n, seed = None):
+	"""
+	Draws n times (with replacement) an element of population, the
+	i-th with probability weights[i]. With probability 1 - sum(weights)
+	nothing is drawn. Returns the (sorted) distinct elements drawn
 
-	# takes away the artificial element
-	new_ids = np.unique(new_ids)
-	new_ids = [i for i in new_ids if i != len(population)]
-	new_ids = np.array(new_ids)
-	
-	return new_ids
\ No newline at end of file
+	seed -- seed of the draws (None: the global numpy random state)
+
+	See WeightedSampler to draw repeatedly from changing weights
+	"""
+	population = np.asarray(population)
+	sampler = WeightedSampler(weights, seed)
+	return np.unique(population[sampler.draw(n, total=1.0)])
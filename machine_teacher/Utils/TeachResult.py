@@ -34,7 +34,11 @@ class TeachResult:
 		qtd_classes: int,
 		dist_classes, # vetor com o % de cada classe,
 		validation_set_accuracy: float,
-		dataset_name: str = _DATASET_STD_NAME):
+		dataset_name: str = _DATASET_STD_NAME,
+		accuracy: float = None): # if None, computed by the teacher
+
+		if accuracy is None:
+			accuracy = T._get_accuracy(h)
 
 		# output
 		self.h = h
@@ -53,7 +57,7 @@ class TeachResult:
 			timer.total_time, # total_time
 			qtd_iters, # qtd_iters
 			len(S_ids), # teaching_set_size
-			T._get_accuracy(h), # accuracy,
+			accuracy, # accuracy,
 			timer["get_examples"], # get_examples_time
 			timer["training"], # training time
 			timer["classification"], # classification time,
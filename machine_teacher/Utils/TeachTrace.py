@@ -0,0 +1,161 @@
+"""
+This modules implements the class TeachTrace, the record of
+the sequence of ids exchanged in a teaching session: the first
+examples, the test ids and the new training ids of each iteration
+(and, if the teacher weights the examples or chooses the columns,
+the weights and the columns of each fit)
+
+A trace can be saved in a compact binary file and replayed
+(see Protocol.replay) with another learner, with no teacher cost
+and no test phase
+
+If the duplicate examples were collapsed (see Utils.Deduplication),
+the ids are unique examples: the trace also records the row of each
+unique example and its multiplicity, so it is replayed over the
+original dataset with the same weights
+"""
+
+import numpy as np
+
+from ..Definitions import get_ids_dtype
+from ..Definitions import wrapp_ids
+
+class TeachTrace:
+	"""
+	A class to represent the sequence of ids of a teaching session
+
+	Methods
+	-----------
+	set_first_examples(ids)
+		Records the first examples given to the learner
+
+	add_iteration(test_ids, new_train_ids)
+		Records the ids of an iteration
+
+	add_sample_weight(sample_weight)
+		Records the weights of the teacher for the training set of
+		the next fit
+
+	add_columns(columns)
+		Records the (indexes of the) columns of the next fit
+
+	set_unique_rows(rows, multiplicity, qtd_rows)
+		Records that the ids are unique examples: rows[u] is the row
+		of example u in a dataset of qtd_rows rows and multiplicity[u]
+		is its number of rows
+
+	save(path)
+		Saves the trace in a (compressed) binary file
+
+	load(path) -> TeachTrace
+		Loads a trace saved by save (static method)
+	"""
+	def __init__(self, m: int, join_sets: bool = True,
+		record_test_ids: bool = True):
+		self.m = m
+		self.join_sets = join_sets
+		self.record_test_ids = record_test_ids
+		self.first_ids = wrapp_ids([], m)
+		self.test_ids = []
+		self.new_train_ids = []
+		self.sample_weights = [] # one vector for each fit (if weighted)
+		self.columns = [] # one vector for each fit (if the columns are chosen)
+		self.qtd_rows = m # rows of the dataset
+		self.rows = None # rows of the unique examples (if deduplicated)
+		self.multiplicity = None
+
+	def set_first_examples(self, ids):
+		self.first_ids = wrapp_ids(ids, self.m)
+
+	def add_iteration(self, test_ids, new_train_ids):
+		if not self.record_test_ids:
+			test_ids = []
+		self.test_ids.append(wrapp_ids(test_ids, self.m))
+		self.new_train_ids.append(wrapp_ids(new_train_ids, self.m))
+
+	def add_sample_weight(self, sample_weight):
+		self.sample_weights.append(np.asarray(sample_weight, dtype=np.float64))
+
+	def is_weighted(self) -> bool:
+		return len(self.sample_weights) > 0
+
+	def add_columns(self, columns):
+		self.columns.append(np.asarray(columns, dtype=np.int64))
+
+	def has_columns(self) -> bool:
+		return len(self.columns) > 0
+
+	def set_unique_rows(self, rows, multiplicity, qtd_rows: int):
+		assert len(rows) == len(multiplicity) == self.m
+		self.rows = wrapp_ids(rows, qtd_rows)
+		self.multiplicity = np.asarray(multiplicity)
+		self.qtd_rows = qtd_rows
+
+	def is_deduplicated(self) -> bool:
+		return self.rows is not None
+
+	def get_qtd_iters(self) -> int:
+		return len(self.new_train_ids)
+
+	def save(self, path: str):
+		(train_ids, train_offsets) = _pack(self.new_train_ids, self.m)
+		(test_ids, test_offsets) = _pack(self.test_ids, self.m)
+		(weights, weight_offsets) = _pack(self.sample_weights, self.m)
+		(columns, column_offsets) = _pack(self.columns, self.m)
+
+		with open(path, "wb") as fp:
+			np.savez_compressed(fp,
+				m = self.m,
+				join_sets = self.join_sets,
+				record_test_ids = self.record_test_ids,
+				first_ids = self.first_ids,
+				train_ids = train_ids,
+				train_offsets = train_offsets,
+				test_ids = test_ids,
+				test_offsets = test_offsets,
+				sample_weights = weights,
+				sample_weight_offsets = weight_offsets,
+				columns = columns,
+				column_offsets = column_offsets,
+				qtd_rows = self.qtd_rows,
+				deduplicated = self.is_deduplicated(),
+				rows = _get_array(self.rows),
+				multiplicity = _get_array(self.multiplicity))
+
+	@staticmethod
+	def load(path: str):
+		with np.load(path) as data:
+			trace = TeachTrace(int(data["m"]), bool(data["join_sets"]),
+				bool(data["record_test_ids"]))
+			trace.first_ids = data["first_ids"]
+			trace.new_train_ids = _unpack(data["train_ids"],
+				data["train_offsets"])
+			trace.test_ids = _unpack(data["test_ids"], data["test_offsets"])
+			# (not in the traces saved before the weights, the columns
+			# and the deduplication option)
+			if "sample_weights" in data.files:
+				trace.sample_weights = _unpack(data["sample_weights"],
+					data["sample_weight_offsets"])
+			if "columns" in data.files:
+				trace.columns = _unpack(data["columns"], data["column_offsets"])
+			if "deduplicated" in data.files and bool(data["deduplicated"]):
+				trace.set_unique_rows(data["rows"], data["multiplicity"],
+					int(data["qtd_rows"]))
+
+		return trace
+
+def _pack(v, m):
+	# concatenates the vectors in v; offsets[i] is where v[i] starts
+	sizes = [len(vi) for vi in v]
+	offsets = np.zeros(len(v) + 1, dtype=np.int64)
+	offsets[1:] = np.cumsum(sizes)
+	if len(v) == 0:
+		return (np.array([], dtype=get_ids_dtype(m)), offsets)
+	return (np.concatenate(v), offsets)
+
+def _get_array(v):
+	# None is saved as an empty array
+	return np.array([]) if v is None else v
+
+def _unpack(values, offsets):
+	return [values[offsets[i]:offsets[i+1]] for i in range(len(offsets) - 1)]
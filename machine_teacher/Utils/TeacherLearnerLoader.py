@@ -12,14 +12,23 @@ _D_LEARNERS = {
 	Learners.SVMLinearLearner.name: Learners.SVMLinearLearner,
 	Learners.LGBMLearner.name: Learners.LGBMLearner,
 	Learners.RandomForestLearner.name: Learners.RandomForestLearner,
-	Learners.DecisionTreeLearner.name: Learners.DecisionTreeLearner
+	Learners.DecisionTreeLearner.name: Learners.DecisionTreeLearner,
+	Learners.SGDLearner.name: Learners.SGDLearner,
+	Learners.NaiveBayesLearner.name: Learners.NaiveBayesLearner,
+	Learners.RemoteLearner.name: Learners.RemoteLearner
 }
 
 _D_TEACHERS = {
 	Teachers.WTFTeacher.name: Teachers.WTFTeacher,
 	Teachers.SingleBatchTeacher.name: Teachers.SingleBatchTeacher,
 	Teachers.DoubleTeacher.name: Teachers.DoubleTeacher,
-	Teachers.FixedPercWrongTeacher.name: Teachers.FixedPercWrongTeacher
+	Teachers.FixedPercWrongTeacher.name: Teachers.FixedPercWrongTeacher,
+	Teachers.MarginTeacher.name: Teachers.MarginTeacher,
+	Teachers.ClusterTeacher.name: Teachers.ClusterTeacher,
+	Teachers.PerClassErrorTeacher.name: Teachers.PerClassErrorTeacher,
+	Teachers.ProxyTeacher.name: Teachers.ProxyTeacher,
+	Teachers.PortfolioTeacher.name: Teachers.PortfolioTeacher,
+	Teachers.FeaturePruningTeacher.name: Teachers.FeaturePruningTeacher
 }
 
 def get_teacher(teacher_name, args):
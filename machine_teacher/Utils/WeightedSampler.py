@@ -0,0 +1,128 @@
+"""
+This module implements the class WeightedSampler, a structure to
+sample ids with probability proportional to (changing) weights
+
+The weights are kept in a Fenwick (binary indexed) tree, so updating
+k weights costs O(k log m) and drawing n ids costs O(n log m), instead
+of rebuilding the cumulative distribution (O(m)) on every draw. All the
+operations are vectorized over the ids
+"""
+
+import numpy as np
+
+class WeightedSampler:
+	"""
+	Samples ids in [0, m) with probability proportional to their weights
+
+	Parameters
+	-----------
+	weights -- the (non negative) weight of each id
+	seed -- seed of the random generator (an int, a np.random.Generator,
+	a np.random.RandomState or None: the global numpy random state, so
+	the draws follow np.random.seed)
+
+	Methods
+	-----------
+	update(ids, weights)
+		Sets the weights of (distinct) ids
+
+	get_total() -> float
+		Returns the sum of the weights
+
+	sample(n, replace = True) -> np.ndarray
+		Draws n ids, with or without replacement
+
+	draw(n, total = None) -> np.ndarray
+		Draws n values in (0, total] and returns the ids hit by them
+		(the values above the sum of the weights hit no id)
+
+	search(values) -> np.ndarray
+		Returns, for each value v in (0, total], the id i such that
+		sum(weights[:i]) < v <= sum(weights[:i+1])
+	"""
+	def __init__(self, weights, seed = None):
+		self.weights = np.array(weights, dtype=np.float64).reshape(-1)
+		self.m = self.weights.size
+		if seed is None:
+			self._random = np.random # the global state (np.random.random)
+		elif isinstance(seed, np.random.RandomState):
+			self._random = seed
+		else:
+			self._random = np.random.default_rng(seed)
+		self._build()
+
+	def _build(self):
+		# tree[i] (1-indexed) is the sum of weights[i - lowbit(i):i]
+		cum = np.zeros(self.m + 1)
+		cum[1:] = np.cumsum(self.weights)
+		i = np.arange(1, self.m + 1)
+		self._tree = np.zeros(self.m + 1)
+		self._tree[1:] = cum[i] - cum[i - (i & -i)]
+		self._top_step = 1 << (self.m.bit_length() - 1) if self.m > 0 else 0
+
+	def update(self, ids, weights):
+		ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+		weights = np.broadcast_to(np.asarray(weights, dtype=np.float64),
+			ids.shape)
+		delta = weights - self.weights[ids]
+		self.weights[ids] = weights
+
+		i = ids + 1
+		while i.size > 0:
+			np.add.at(self._tree, i, delta)
+			i = i + (i & -i)
+			valid = i <= self.m
+			(i, delta) = (i[valid], delta[valid])
+
+	def get_total(self) -> float:
+		# the sum of the roots of the tree
+		total = 0.0
+		i = self.m
+		while i > 0:
+			total += self._tree[i]
+			i -= i & -i
+		return total
+
+	def search(self, values) -> np.ndarray:
+		values = np.array(values, dtype=np.float64).reshape(-1)
+		pos = np.zeros(values.size, dtype=np.int64)
+		step = self._top_step
+		while step > 0:
+			nxt = pos + step
+			go = nxt <= self.m
+			go[go] = self._tree[nxt[go]] < values[go]
+			values[go] -= self._tree[nxt[go]]
+			pos[go] = nxt[go]
+			step >>= 1
+		return np.minimum(pos, self.m - 1)
+
+	def sample(self, n: int, replace: bool = True) -> np.ndarray:
+		if replace:
+			return self.draw(n)
+
+		# the first occurrences of the ids in a sequence of draws (with
+		# replacement) are a sample without replacement. The drawn ids
+		# get weight zero until the end
+		qtd_positive = np.count_nonzero(self.weights > 0)
+		assert n <= qtd_positive, "not enough ids with positive weight"
+		chosen = np.zeros(0, dtype=np.int64)
+		chosen_weights = np.zeros(0)
+		while chosen.size < n:
+			draws = self.draw(n - chosen.size)
+			(new_ids, first) = np.unique(draws, return_index=True)
+			new_ids = new_ids[np.argsort(first)]
+			new_ids = new_ids[self.weights[new_ids] > 0]
+			chosen = np.append(chosen, new_ids)
+			chosen_weights = np.append(chosen_weights, self.weights[new_ids])
+			self.update(new_ids, 0.0)
+
+		self.update(chosen, chosen_weights)
+		return chosen
+
+	def draw(self, n: int, total: float = None) -> np.ndarray:
+		# total: None is the sum of the weights (every value hits an id)
+		weights_total = self.get_total()
+		if total is None:
+			total = weights_total
+		values = (1.0 - self._random.random(n)) * total
+		return self.search(values[values <= weights_total])
@@ -1,4 +1,5 @@
 from .Protocol import teach
+from .Protocol import replay
 from . import Teachers
 from . import Learners
 from . import Reports